@@ -0,0 +1,390 @@
+import calendar
+import datetime
+from array import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# date ordinal of the first day of numpy's datetime64 (1970-01-01)
+EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+# number of months of the rolling averages
+ROLLING_WINDOW = 3
+
+
+def month_number(month):
+    """month number (year * 12 + month - 1) of a month (yyyy-mm), None if invalid
+
+    Parameters
+    ----------
+    month : str
+        month of the monthly totals
+    """
+
+    try:
+        year, number = month.split("-")
+        return int(year) * 12 + int(number) - 1
+    except (AttributeError, ValueError):
+        return None
+
+
+def series(first, values):
+    """(month number, value) tuples of a vector starting at a month
+
+    Parameters
+    ----------
+    first : int
+        month number of the first value
+    values : numpy.ndarray or array
+        one value per month
+    """
+
+    values = values.tolist()
+    return list(zip(range(first, first + len(values)), values))
+
+
+def rolling_average(values, window=ROLLING_WINDOW):
+    """trailing average of a vector, the first values average fewer months
+
+    Parameters
+    ----------
+    values : numpy.ndarray or array
+        one value per month
+    window : int
+        number of months to average
+    """
+
+    if numpy is not None:
+        values = numpy.asarray(values, dtype=float)
+        sums = numpy.cumsum(numpy.concatenate(([0.0], values)))
+        ends = numpy.arange(1, len(values) + 1)
+        starts = numpy.maximum(ends - window, 0)
+        return (sums[ends] - sums[starts]) / (ends - starts)
+    averages = array('d')
+    total = 0
+    for index, value in enumerate(values):
+        total += value
+        if index >= window:
+            total -= values[index - window]
+        averages.append(total / min(index + 1, window))
+    return averages
+
+
+def year_over_year(values):
+    """difference of every month to the same month of the previous year
+
+    The result starts with the 13th month of the vector.
+
+    Parameters
+    ----------
+    values : numpy.ndarray or array
+        one value per month
+    """
+
+    if numpy is not None:
+        values = numpy.asarray(values, dtype=float)
+        return values[12:] - values[:-12]
+    return array('d', [values[i] - values[i - 12] for i in range(12, len(values))])
+
+
+def linear_fit(xs, ys):
+    """slope and intercept of the least squares line through points
+
+    Parameters
+    ----------
+    xs : sequence
+        x values, at least two different ones
+    ys : sequence
+        y values
+    """
+
+    if numpy is not None:
+        xs = numpy.asarray(xs, dtype=float)
+        ys = numpy.asarray(ys, dtype=float)
+        mean_x = xs.mean()
+        mean_y = ys.mean()
+        slope = ((xs - mean_x) * (ys - mean_y)).sum() / ((xs - mean_x) ** 2).sum()
+        return float(slope), float(mean_y - slope * mean_x)
+    mean_x = sum(xs) / len(xs)
+    mean_y = sum(ys) / len(ys)
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) \
+            / sum((x - mean_x) ** 2 for x in xs)
+    return slope, mean_y - slope * mean_x
+
+
+class MonthlyTotals(object):
+    """
+    MonthlyTotals class used to analyse the totals per month and type
+
+    The totals are a matrix with one row per month, from the first to the
+    last month without gaps, and one column per type. With NumPy the matrix
+    is an array and every analysis is vectorized, without NumPy the rows
+    are arrays of floats and the same results are calculated in loops.
+
+    ...
+
+    Attributes
+    ----------
+    first : int
+        month number (year * 12 + month - 1) of the first row
+    types : list
+        type of every column
+    totals : numpy.ndarray or list
+        sum of the prices per month and type
+
+    Methods
+    -------
+    from_rows(rows, types)
+        create the totals from the monthly totals of the model
+    from_columns(columns, types)
+        create the totals from a TransactionColumns
+    column(type)
+        totals of a type per month
+    spending(income_type)
+        expenditures of all types but income per month
+    net()
+        sum of all prices per month
+    trend(income_type, window=ROLLING_WINDOW)
+        rolling average of the expenditures of every type
+    year_over_year(income_type)
+        change of the expenditures to the same month of the previous year
+    projection(balance, method='linear')
+        projection of the balance to the end of the last month
+    """
+
+    def __init__(self, first, types, totals):
+        """
+        Parameters
+        ----------
+        first : int
+            month number of the first row
+        types : list
+            type of every column
+        totals : numpy.ndarray or list
+            sum of the prices per month and type
+        """
+
+        self.first = first
+        self.types = list(types)
+        self.totals = totals
+
+    @classmethod
+    def from_rows(cls, rows, types):
+        """create the totals from (month, type, sum, count) rows
+
+        Parameters
+        ----------
+        rows : list
+            monthly totals, e.g. SQLiteCRUD.read_monthly_totals()
+        types : list
+            types of the columns, rows of other types are ignored
+        """
+
+        columns = {t: i for i, t in enumerate(types)}
+        months = []
+        codes = []
+        sums = []
+        for month, type, total, count in rows:
+            number = month_number(month)
+            if number is None or type not in columns:
+                continue
+            months.append(number)
+            codes.append(columns[type])
+            sums.append(total or 0)
+        return cls.build(months, codes, sums, types)
+
+    @classmethod
+    def from_columns(cls, columns, types):
+        """create the totals from the transactions of a column store
+
+        Parameters
+        ----------
+        columns : TransactionColumns
+            transactions, e.g. of SQLiteCRUD.iter_items(filters)
+        types : list
+            types of the columns, transactions of other types are ignored
+        """
+
+        index = {t: i for i, t in enumerate(types)}
+        mapping = [index.get(t, -1) for t in columns.types]
+        if numpy is None:
+            months = []
+            codes = []
+            sums = []
+            for ordinal, price, code in zip(columns.ordinals, columns.prices, columns.codes):
+                # NULL prices are NaN and not summed
+                if ordinal <= 0 or mapping[code] < 0 or price != price:
+                    continue
+                day = datetime.date.fromordinal(ordinal)
+                months.append(day.year * 12 + day.month - 1)
+                codes.append(mapping[code])
+                sums.append(price)
+            return cls.build(months, codes, sums, types)
+        ordinals = numpy.frombuffer(columns.ordinals, dtype=numpy.int32)
+        prices = numpy.frombuffer(columns.prices, dtype=numpy.float64)
+        codes = numpy.asarray(mapping, dtype=numpy.int64)[
+                numpy.frombuffer(columns.codes, dtype=numpy.uint16)] \
+                if mapping else numpy.zeros(0, dtype=numpy.int64)
+        keep = (ordinals > 0) & (codes >= 0) & ~numpy.isnan(prices)
+        # months since 1970-01 by numpy's calendar
+        months = (ordinals[keep] - EPOCH_ORDINAL).astype('datetime64[D]') \
+                .astype('datetime64[M]').astype(numpy.int64) + 1970 * 12
+        return cls.build(months, codes[keep], prices[keep], types)
+
+    @classmethod
+    def build(cls, months, codes, sums, types):
+        """helper-method to sum the prices into the matrix
+
+        Parameters
+        ----------
+        months : sequence
+            month number of every price
+        codes : sequence
+            column of every price
+        sums : sequence
+            prices
+        types : list
+            type of every column
+        """
+
+        width = len(types)
+        if numpy is not None:
+            months = numpy.asarray(months, dtype=numpy.int64)
+            if not len(months):
+                return cls(0, types, numpy.zeros((0, width)))
+            first = int(months.min())
+            height = int(months.max()) - first + 1
+            cells = (months - first) * width + numpy.asarray(codes, dtype=numpy.int64)
+            totals = numpy.bincount(cells, weights=numpy.asarray(sums, dtype=float),
+                    minlength=height * width)
+            return cls(first, types, totals.reshape(height, width))
+        if not months:
+            return cls(0, types, [])
+        first = min(months)
+        totals = [array('d', [0.0] * width) for _ in range(max(months) - first + 1)]
+        for month, code, total in zip(months, codes, sums):
+            totals[month - first][code] += total
+        return cls(first, types, totals)
+
+    def __len__(self):
+        return len(self.totals)
+
+    def column(self, type):
+        """totals of a type per month
+
+        Parameters
+        ----------
+        type : str
+            type of the transactions
+        """
+
+        index = self.types.index(type)
+        if numpy is not None:
+            return self.totals[:, index]
+        return array('d', [row[index] for row in self.totals])
+
+    def spending(self, income_type):
+        """expenditures of all types but income per month, as positive amounts
+
+        Parameters
+        ----------
+        income_type : str
+            type of the income
+        """
+
+        columns = [i for i, t in enumerate(self.types) if t != income_type]
+        if numpy is not None:
+            return -self.totals[:, columns].sum(axis=1)
+        return array('d', [-sum(row[i] for i in columns) for row in self.totals])
+
+    def net(self):
+        """sum of all prices per month
+
+        """
+
+        if numpy is not None:
+            return self.totals.sum(axis=1)
+        return array('d', [sum(row) for row in self.totals])
+
+    def trend(self, income_type, window=ROLLING_WINDOW):
+        """rolling average of the expenditures of every type but income
+
+        Returns a list with the type and its (month number, average) tuples.
+
+        Parameters
+        ----------
+        income_type : str
+            type of the income
+        window : int
+            number of months to average
+        """
+
+        if numpy is not None:
+            values = -self.totals
+            return [[t, series(self.first, rolling_average(values[:, i], window))]
+                    for i, t in enumerate(self.types) if t != income_type]
+        return [[t, series(self.first, rolling_average(
+                array('d', [-v for v in self.column(t)]), window))]
+                for t in self.types if t != income_type]
+
+    def year_over_year(self, income_type):
+        """change of the expenditures to the same month of the previous year
+
+        Returns (month number, change) tuples, starting with the 13th month.
+
+        Parameters
+        ----------
+        income_type : str
+            type of the income
+        """
+
+        return series(self.first + 12, year_over_year(self.spending(income_type)))
+
+    def projection(self, balance, method='linear'):
+        """projection of the balance to the end of the month of the last day
+
+        The linear method extends the least squares line through the
+        balances of the month. The seasonal method adds the part of the
+        remaining days of the average net of the same month in previous
+        years.
+
+        Returns the balances of the month and the projected line from the
+        last day to the end of the month, both as (date ordinal, balance).
+
+        Parameters
+        ----------
+        balance : list
+            (date ordinal, balance) at the end of every day, sorted by date
+        method : str
+            'linear' or 'seasonal'
+
+        Raises
+        ------
+        ValueError
+            If the method is unknown
+        """
+
+        if method not in ('linear', 'seasonal'):
+            raise ValueError('unknown projection method "{}"'.format(method))
+        if not balance:
+            return [], []
+        last_day, last_balance = balance[-1]
+        day = datetime.date.fromordinal(last_day)
+        start = day.replace(day=1).toordinal()
+        days = calendar.monthrange(day.year, day.month)[1]
+        end = start + days - 1
+        month = [tuple(point) for point in balance if point[0] >= start]
+        if method == 'linear':
+            if len(month) < 2:
+                return month, [(last_day, last_balance), (end, last_balance)]
+            slope, intercept = linear_fit([p[0] for p in month], [p[1] for p in month])
+            projected = last_balance + slope * (end - last_day)
+        else:
+            net = self.net()
+            current = day.year * 12 + day.month - 1
+            previous = [net[m - self.first] for m in range(current - 12, self.first - 1, -12)
+                    if m - self.first < len(net)]
+            average = sum(previous) / len(previous) if previous else 0
+            projected = last_balance + float(average) * (end - last_day) / days
+        return month, [(last_day, last_balance), (end, float(projected))]
@@ -1,31 +1,82 @@
+import argparse
 import sys
 
 from tkinter import *
 
+import profiling
 from controller import tkinterApp
-from model import SQLiteCRUD
+from db_worker import DBWorker
+from model import SQLiteCRUD, TABLE_NAME
+from snapshot import Snapshot
+
+# interval in ms to check if the first data is shown in profile mode
+PAINT_INTERVAL = 10
+DB_PATH = 'transactions.db'
+# columnar copy of the ledger, shown while the database is opened
+SNAPSHOT_PATH = 'transactions.snapshot'
 
 
 class Application():
     """
     Application class used to start the tkinter App
 
+    A valid snapshot of the ledger is shown at startup and the snapshot
+    is written again on exit if the data changed.
+
+    With a profile path the timings of startup, first paint and all
+    database calls and user actions are written to a JSON file on exit.
+
     """
-    def __init__(self, *args, **kwargs):
-
-        app = tkinterApp(SQLiteCRUD())
-        app.title("FiN Planer")
-        app.geometry("1000x450+100+100") 
-        # select Icon File for Windows or Linux Machine
-        if (sys.platform.startswith('win')):
-            app.iconbitmap('icons/icon.ico')
-        else:
-            logo = PhotoImage(file = 'icons/icon.gif')
-            app.call('wm', 'iconphoto', app._w, logo)
+    def __init__(self, profile=None, *args, **kwargs):
+
+        if profile:
+            profiling.enable()
+        with profiling.span("startup"):
+            # check the snapshot before the worker opens the database
+            snapshot = Snapshot.open(SNAPSHOT_PATH, DB_PATH, TABLE_NAME)
+            app = tkinterApp(DBWorker(SQLiteCRUD), snapshot=snapshot, 
+                    snapshot_path=SNAPSHOT_PATH)
+            app.title("FiN Planer")
+            app.geometry("1000x450+100+100")
+            # select Icon File for Windows or Linux Machine
+            if (sys.platform.startswith('win')):
+                app.iconbitmap('icons/icon.ico')
+            else:
+                logo = PhotoImage(file = 'icons/icon.gif')
+                app.call('wm', 'iconphoto', app._w, logo)
+            app.update_idletasks()
+        profiling.mark("startup")
+        if profile:
+            self.wait_first_paint(app)
         app.mainloop()
+        app.close_snapshot()
+        saved = None
+        if app.snapshot_dirty and app.model.created.exception() is None:
+            saved = app.model.submit(app.write_snapshot)
+        app.model.stop()
+        if saved is not None and saved.exception() is not None:
+            print(saved.exception())
+        if profile:
+            profiling.mark("exit")
+            profiling.write(profile)
 
+    def wait_first_paint(self, app):
+        """mark the first paint once the data of the table is shown
 
-if __name__ == '__main__':
-    Application()
+        Parameters
+        ----------
+        app : tkinterApp
+            the running app
+        """
+        if app.pending:
+            app.after(PAINT_INTERVAL, lambda: self.wait_first_paint(app))
+            return
+        app.update_idletasks()
+        profiling.mark("first paint")
 
 
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="FiN Planer")
+    parser.add_argument('--profile', metavar='PATH',
+            help="write timings of startup, first paint and user actions to a JSON file")
+    Application(profile=parser.parse_args().profile)
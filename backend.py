@@ -0,0 +1,425 @@
+from abc import ABC, abstractmethod
+
+# columns the records can be sorted by
+SORT_COLUMNS = ('rowid', 'idate', 'name', 'price', 'type')
+
+# names of the filters every backend understands
+FILTER_NAMES = ('date_from', 'date_to', 'types', 'price_min', 'price_max')
+
+
+class StorageBackend(ABC):
+    """
+    StorageBackend class used as interface of the storage engines
+
+    A backend stores the records (rowid, idate, name, price, type) of one
+    or more tables. The model only uses the methods below, so every engine
+    implementing them can be passed to the model. All methods but
+    use_monthly_totals() are abstract, a backend missing one of them can
+    not be created. DBConnection stores the
+    records in SQLite, MemoryBackend keeps them in memory.
+
+    Filters are dictionaries with the optional keys of FILTER_NAMES:
+    'date_from' and 'date_to' (yyyy-mm-dd), 'types' (list of types),
+    'price_min' and 'price_max'.
+
+    ...
+
+    Methods
+    -------
+    transaction()
+        context manager to group many writes into one commit
+    close()
+        release the storage
+    migrate(table_name)
+        create or upgrade the table
+    insert_one(date, name, price, quantity, table_name)
+        insert a record
+    insert_many(records, table_name, batch_size=1000)
+        insert many records in a single transaction
+    select_all(table_name)
+        select all records
+    iter_records(table_name, order='rowid', descending=False, filters=None, batch_size=1000)
+        iterate over the records in bounded memory
+    select_one(id, table_name)
+        select a single record
+    select_page(table_name, after=None, limit=100, order='rowid', descending=False, filters=None)
+        select a page of records following a sort key
+    select_key_at(table_name, offset, order='rowid', descending=False, filters=None)
+        select the sort key at a position of the table
+    count(table_name, filters=None)
+        count the records
+    search(table_name, text, limit=100, filters=None)
+        search records by the words of their name
+    select_monthly_totals(table_name, month_from=None, month_to=None, types=None)
+        select the sums per month and type
+    sum_by_type(table_name, filters=None)
+        sum and count of records grouped by type
+    sum_by_month(table_name, filters=None)
+        sum and count of records grouped by month
+    sum_by_month_and_type(table_name, filters=None)
+        sum and count of records grouped by month and type
+    sum_by_sign(table_name, filters=None)
+        sum and count of records grouped by sign of price
+    sum_by_day(table_name, filters=None)
+        sum of records grouped by date
+    generation(table_name)
+        number of writes to the table
+    use_monthly_totals(filters)
+        check if a query can use the sums per month and type
+    delete_one(id, table_name)
+        delete a record
+    update_one(id, date, name, price, quantity, table_name)
+        update a record
+    """
+
+    @abstractmethod
+    def transaction(self):
+        """context manager to group many writes into one commit
+
+        Contexts can be nested, the outermost one commits. On an exception
+        all writes of the outermost context are rolled back.
+        """
+
+        raise NotImplementedError
+
+    @abstractmethod
+    def close(self):
+        """release the storage
+
+        """
+
+        raise NotImplementedError
+
+    @abstractmethod
+    def migrate(self, table_name):
+        """create or upgrade the table
+
+        Parameters
+        ----------
+        table_name : str
+            name of the table
+        """
+
+        raise NotImplementedError
+
+    @abstractmethod
+    def insert_one(self, date, name, price, quantity, table_name):
+        """insert a record
+
+        Parameters
+        ----------
+        date : str
+            date (yyyy-mm-dd)
+        name : str
+            name of the transaction
+        price : float
+            price, negative for expenditures
+        quantity : str
+            type of the transaction
+        table_name : str
+            name of the table
+        """
+
+        raise NotImplementedError
+
+    @abstractmethod
+    def insert_many(self, records, table_name, batch_size=1000):
+        """insert many records in a single transaction and return their number
+
+        Parameters
+        ----------
+        records : iterable with tuples
+            record details (date, name, price, type)
+        table_name : str
+            name of the table
+        batch_size : int
+            number of records inserted at once
+        """
+
+        raise NotImplementedError
+
+    @abstractmethod
+    def select_all(self, table_name):
+        """select all records ordered by rowid
+
+        Parameters
+        ----------
+        table_name : str
+            name of the table
+        """
+
+        raise NotImplementedError
+
+    @abstractmethod
+    def iter_records(self, table_name, order='rowid', descending=False, filters=None,
+            batch_size=1000):
+        """iterate over the records in sort order in bounded memory
+
+        Parameters
+        ----------
+        table_name : str
+            name of the table
+        order : str
+            column to sort by, one of SORT_COLUMNS
+        descending : bool
+            True to sort descending
+        filters : dictionary
+            optional filters
+        batch_size : int
+            number of records read at once
+        """
+
+        raise NotImplementedError
+
+    @abstractmethod
+    def select_one(self, id, table_name):
+        """select a single record, None if it is not stored
+
+        Parameters
+        ----------
+        id : int
+            rowid of the record
+        table_name : str
+            name of the table
+        """
+
+        raise NotImplementedError
+
+    @abstractmethod
+    def select_page(self, table_name, after=None, limit=100, order='rowid', descending=False,
+            filters=None):
+        """select a page of records following a sort key (keyset pagination)
+
+        Parameters
+        ----------
+        table_name : str
+            name of the table
+        after : tuple
+            sort key of the last record of the previous page, (rowid,) or
+            (value, rowid), None for the first page
+        limit : int
+            maximum number of records
+        order : str
+            column to sort by, one of SORT_COLUMNS
+        descending : bool
+            True to sort descending
+        filters : dictionary
+            optional filters
+        """
+
+        raise NotImplementedError
+
+    @abstractmethod
+    def select_key_at(self, table_name, offset, order='rowid', descending=False, filters=None):
+        """select the sort key at a position of the table, None after the end
+
+        Parameters
+        ----------
+        table_name : str
+            name of the table
+        offset : int
+            position of the record, starting at 0
+        order : str
+            column to sort by, one of SORT_COLUMNS
+        descending : bool
+            True to sort descending
+        filters : dictionary
+            optional filters
+        """
+
+        raise NotImplementedError
+
+    @abstractmethod
+    def count(self, table_name, filters=None):
+        """count the records
+
+        Parameters
+        ----------
+        table_name : str
+            name of the table
+        filters : dictionary
+            optional filters
+        """
+
+        raise NotImplementedError
+
+    @abstractmethod
+    def search(self, table_name, text, limit=100, filters=None):
+        """search records by the words of their name, newest records first
+
+        Parameters
+        ----------
+        table_name : str
+            name of the table
+        text : str
+            words to search for, matched as prefixes
+        limit : int
+            maximum number of records
+        filters : dictionary
+            optional filters
+        """
+
+        raise NotImplementedError
+
+    @abstractmethod
+    def select_monthly_totals(self, table_name, month_from=None, month_to=None, types=None):
+        """select (month, type, sum, count) ordered by month and type
+
+        Parameters
+        ----------
+        table_name : str
+            name of the table
+        month_from : str
+            first month to include (yyyy-mm), optional
+        month_to : str
+            last month to include (yyyy-mm), optional
+        types : list
+            types to include, optional
+        """
+
+        raise NotImplementedError
+
+    @abstractmethod
+    def sum_by_type(self, table_name, filters=None):
+        """sum and count of records grouped by type
+
+        Parameters
+        ----------
+        table_name : str
+            name of the table
+        filters : dictionary
+            optional filters
+        """
+
+        raise NotImplementedError
+
+    @abstractmethod
+    def sum_by_month(self, table_name, filters=None):
+        """sum and count of records grouped by month (yyyy-mm), ordered by month
+
+        Parameters
+        ----------
+        table_name : str
+            name of the table
+        filters : dictionary
+            optional filters
+        """
+
+        raise NotImplementedError
+
+    @abstractmethod
+    def sum_by_month_and_type(self, table_name, filters=None):
+        """(month, type, sum, count) of the records, ordered by month and type
+
+        Parameters
+        ----------
+        table_name : str
+            name of the table
+        filters : dictionary
+            optional filters
+        """
+
+        raise NotImplementedError
+
+    @abstractmethod
+    def sum_by_sign(self, table_name, filters=None):
+        """sum and count of expenditures (sign -1) and income (sign 1)
+
+        Parameters
+        ----------
+        table_name : str
+            name of the table
+        filters : dictionary
+            optional filters
+        """
+
+        raise NotImplementedError
+
+    @abstractmethod
+    def sum_by_day(self, table_name, filters=None):
+        """sum of records grouped by date, ordered by date
+
+        Parameters
+        ----------
+        table_name : str
+            name of the table
+        filters : dictionary
+            optional filters
+        """
+
+        raise NotImplementedError
+
+    @abstractmethod
+    def generation(self, table_name):
+        """number of writes to the table
+
+        The number changes with every insert, update and delete, so it can
+        be used to check if a copy of the records is up to date.
+
+        Parameters
+        ----------
+        table_name : str
+            name of the table
+        """
+
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete_one(self, id, table_name):
+        """delete a record
+
+        Parameters
+        ----------
+        id : int
+            rowid of the record
+        table_name : str
+            name of the table
+
+        Raises
+        ------
+        ItemNotStored
+            If no record is found
+        """
+
+        raise NotImplementedError
+
+    @abstractmethod
+    def update_one(self, id, date, name, price, quantity, table_name):
+        """update a record
+
+        Parameters
+        ----------
+        id : int
+            rowid of the record
+        date : str
+            date (yyyy-mm-dd)
+        name : str
+            name of the transaction
+        price : float
+            price, negative for expenditures
+        quantity : str
+            type of the transaction
+        table_name : str
+            name of the table
+
+        Raises
+        ------
+        ItemNotStored
+            If no record is found
+        """
+
+        raise NotImplementedError
+
+    def use_monthly_totals(self, filters):
+        """check if a query can use the sums per month and type
+
+        Only the 'types' filter can be answered from the sums per month and
+        type, all other filters need the records.
+
+        Parameters
+        ----------
+        filters : dictionary
+            optional filters
+        """
+
+        return all(value is None or name == 'types' for name, value in (filters or {}).items())
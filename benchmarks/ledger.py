@@ -0,0 +1,66 @@
+import datetime
+import random
+
+from model import TRANSACTION_TYPES
+
+# names of the generated transactions per type
+NAMES = {
+    "Gehalt": ["Gehalt", "Bonus", "Erstattung"],
+    "Lebenshaltung": ["Supermarkt", "Bäckerei", "Drogerie", "Apotheke", "Wochenmarkt"],
+    "Mobilität": ["Tankstelle", "Bahnticket", "Werkstatt", "Parkhaus", "Carsharing"],
+    "Sonstiges": ["Restaurant", "Kino", "Geschenk", "Buchhandlung", "Spende"],
+    "Telekommunikation": ["Mobilfunk", "Internet", "Streaming"],
+    "Wohnen": ["Miete", "Strom", "Gas", "Hausrat", "Baumarkt"],
+}
+# share of the transactions per type
+WEIGHTS = {
+    "Gehalt": 5,
+    "Lebenshaltung": 40,
+    "Mobilität": 20,
+    "Sonstiges": 20,
+    "Telekommunikation": 5,
+    "Wohnen": 10,
+}
+# range of the absolute amounts per type
+AMOUNTS = {
+    "Gehalt": (1500, 4500),
+    "Lebenshaltung": (2, 150),
+    "Mobilität": (3, 400),
+    "Sonstiges": (5, 250),
+    "Telekommunikation": (10, 80),
+    "Wohnen": (30, 1200),
+}
+START = datetime.date(2010, 1, 1)
+# about 50 transactions per day, 1M transactions cover about 55 years
+PER_DAY = 50
+
+
+def generate(count, seed=0, transaction_types=TRANSACTION_TYPES):
+    """generate a synthetic ledger as (date, name, price, type) tuples
+
+    The ledger only depends on count and seed, so every run and every
+    version of the app works with the same data. The dates are ascending
+    with about PER_DAY transactions per day, income is positive and all
+    other types are negative.
+
+    Parameters
+    ----------
+    count : int
+        number of transactions
+    seed : int
+        seed of the random generator
+    transaction_types : list
+        types of the transactions, the first one is income
+    """
+
+    rng = random.Random(seed)
+    weights = [WEIGHTS.get(t, 10) for t in transaction_types]
+    for i in range(count):
+        input_type = rng.choices(transaction_types, weights)[0]
+        low, high = AMOUNTS.get(input_type, (1, 100))
+        price = round(rng.uniform(low, high), 2)
+        if input_type != transaction_types[0]:
+            price = -price
+        name = rng.choice(NAMES.get(input_type, [input_type]))
+        date = START + datetime.timedelta(days=i // PER_DAY)
+        yield (str(date), name, price, input_type)
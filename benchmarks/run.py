@@ -0,0 +1,269 @@
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from analytics import MonthlyTotals
+from benchmarks.ledger import generate
+from memory_backend import MemoryBackend
+from model import SQLiteCRUD, TABLE_NAME, TRANSACTION_TYPES, TransactionAggregates, TransactionColumns
+from sqlite_backend import DBConnection
+
+SIZES = (10000, 100000, 1000000)
+# number of single row operations (select, insert, update, delete) per size
+SAMPLE = 200
+# storage backends by name, created with the path of the database
+BACKENDS = {
+    "sqlite": DBConnection,
+    "memory": lambda db_name: MemoryBackend(),
+}
+
+
+def measure(function, repeat=5, ops=1):
+    """time a function and return the statistics in seconds
+
+    Parameters
+    ----------
+    function : callable
+        function without arguments to time
+    repeat : int
+        number of runs
+    ops : int
+        number of operations of one run, the statistics are per operation
+    """
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append((time.perf_counter() - start) / ops)
+    return {
+        "runs": repeat,
+        "ops": ops,
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.mean(times),
+        "max": max(times),
+    }
+
+
+def scan_aggregates(rows):
+    """aggregate all rows like the charts did before the running totals
+
+    Parameters
+    ----------
+    rows : list
+        records (rowid, date, name, price, type)
+    """
+
+    aggregates = TransactionAggregates()
+    for row in rows:
+        aggregates.add(row[3], row[4])
+    return aggregates.pie_data(TRANSACTION_TYPES), aggregates.bar_data()
+
+
+def traced_bytes(function):
+    """return the result of a function and the bytes it still holds
+
+    Parameters
+    ----------
+    function : callable
+        function without arguments building the data to measure
+    """
+
+    tracemalloc.start()
+    try:
+        result = function()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return result, size
+
+
+def bench_connection(db, size, seed, repeat):
+    """time the queries of a storage backend on a new database
+
+    Parameters
+    ----------
+    db : StorageBackend
+        empty storage backend, e.g. DBConnection
+    size : int
+        number of generated transactions
+    seed : int
+        seed of the generator
+    repeat : int
+        number of runs per measurement
+    """
+
+    results = {}
+    db.migrate(TABLE_NAME)
+    results["insert_many"] = measure(
+            lambda: db.insert_many(generate(size, seed), TABLE_NAME), repeat=1, ops=size)
+
+    rng = random.Random(seed)
+    ids = rng.sample(range(1, size + 1), min(SAMPLE, size))
+    extra = list(generate(len(ids), seed + 1))
+    results["select_all"] = measure(lambda: db.select_all(TABLE_NAME), repeat)
+    results["select_one"] = measure(
+            lambda: [db.select_one(i, TABLE_NAME) for i in ids], repeat, ops=len(ids))
+    results["select_page_first"] = measure(lambda: db.select_page(TABLE_NAME), repeat)
+    results["select_page_middle"] = measure(lambda: db.select_page(TABLE_NAME,
+            after=db.select_key_at(TABLE_NAME, size // 2, order='price'), order='price'), repeat)
+    results["count"] = measure(lambda: db.count(TABLE_NAME), repeat)
+    results["sum_by_type"] = measure(lambda: db.sum_by_type(TABLE_NAME), repeat)
+    results["sum_by_day"] = measure(lambda: db.sum_by_day(TABLE_NAME), repeat)
+    # single writes commit one by one like the form does
+    results["insert_one"] = measure(
+            lambda: [db.insert_one(*record, table_name=TABLE_NAME) for record in extra],
+            repeat=1, ops=len(extra))
+    results["update_one"] = measure(
+            lambda: [db.update_one(i, *record, table_name=TABLE_NAME)
+                    for i, record in zip(ids, extra)], repeat=1, ops=len(ids))
+    results["delete_one"] = measure(
+            lambda: [db.delete_one(i, TABLE_NAME) for i in ids], repeat=1, ops=len(ids))
+    return results
+
+
+def bench_model(db, repeat):
+    """time SQLiteCRUD.read_items, iter_items and the aggregates of the charts
+
+    The reads are timed without the read cache, which is timed separately.
+
+    Parameters
+    ----------
+    db : StorageBackend
+        storage backend with the generated ledger
+    repeat : int
+        number of runs per measurement
+    """
+
+    results = {}
+    start = time.perf_counter()
+    model = SQLiteCRUD(backend=db, cache_size=0)
+    results["open"] = {"runs": 1, "ops": 1, "seconds": time.perf_counter() - start}
+    cached = SQLiteCRUD(backend=db)
+    cached.read_window(0, 100)
+    cached.read_balance()
+    results["read_window_cached"] = measure(lambda: cached.read_window(0, 100), repeat)
+    results["read_balance_cached"] = measure(cached.read_balance, repeat)
+    results["read_items"] = measure(model.read_items, repeat)
+    results["iter_items"] = measure(lambda: sum(1 for item in model.iter_items()), repeat)
+    rows = model.read_items()
+    results["aggregates_scan"] = measure(lambda: scan_aggregates(rows), repeat)
+    results["columns_build"] = measure(
+            lambda: TransactionColumns.from_items(model.iter_items()), repeat)
+    columns = TransactionColumns.from_items(model.iter_items())
+
+    def columns_aggregates():
+        aggregates = columns.aggregates()
+        return aggregates.pie_data(TRANSACTION_TYPES), aggregates.bar_data()
+
+    results["aggregates_columns"] = measure(columns_aggregates, repeat)
+    # memory per record of the list of tuples and of the column store
+    rows_size = traced_bytes(model.read_items)[1]
+    columns_size = traced_bytes(lambda: TransactionColumns.from_items(model.iter_items()))[1]
+    count = max(1, len(rows))
+    results["bytes_per_row_tuples"] = {"runs": 1, "ops": count, "bytes": rows_size / count}
+    results["bytes_per_row_columns"] = {"runs": 1, "ops": count, "bytes": columns_size / count}
+
+    def load_aggregates():
+        aggregates = TransactionAggregates()
+        aggregates.load(model.read_totals_by_type(), model.read_totals_by_sign())
+        return aggregates.pie_data(TRANSACTION_TYPES), aggregates.bar_data()
+
+    results["aggregates_sql"] = measure(load_aggregates, repeat)
+    results["aggregates_running"] = measure(lambda: (
+            model.aggregates.pie_data(TRANSACTION_TYPES), model.aggregates.bar_data()), repeat)
+    results["read_balance"] = measure(model.read_balance, repeat)
+    results["read_spending"] = measure(lambda: model.read_spending(TRANSACTION_TYPES), repeat)
+    balance = model.read_balance()
+
+    def analyse(monthly):
+        return (monthly.trend(TRANSACTION_TYPES[0]), monthly.year_over_year(TRANSACTION_TYPES[0]),
+                monthly.projection(balance))
+
+    results["analytics_monthly"] = measure(lambda: analyse(
+            MonthlyTotals.from_rows(model.read_monthly_totals(), TRANSACTION_TYPES)), repeat)
+    results["analytics_columns"] = measure(lambda: analyse(
+            MonthlyTotals.from_columns(columns, TRANSACTION_TYPES)), repeat)
+    return results
+
+
+def run(sizes=SIZES, seed=0, repeat=5, directory=None, backend="sqlite"):
+    """run the benchmarks for every size and return the results
+
+    Every size uses a new database in a temporary directory.
+
+    Parameters
+    ----------
+    sizes : list
+        numbers of transactions
+    seed : int
+        seed of the generator
+    repeat : int
+        number of runs per measurement
+    directory : str
+        directory for the databases, a temporary one if None
+    backend : str
+        name of the storage backend, see BACKENDS
+    """
+
+    results = {
+        "backend": backend,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "seed": seed,
+        "sizes": {},
+    }
+    temporary = directory is None
+    directory = directory or tempfile.mkdtemp(prefix="benchmarks")
+    try:
+        for size in sizes:
+            db_name = os.path.join(directory, "ledger_{}".format(size))
+            if os.path.exists(db_name + ".db"):
+                os.remove(db_name + ".db")
+            print("{} transactions".format(size), file=sys.stderr)
+            db = BACKENDS[backend](db_name)
+            try:
+                result = bench_connection(db, size, seed, repeat)
+                result.update(bench_model(db, repeat))
+            finally:
+                db.close()
+            results["sizes"][str(size)] = result
+    finally:
+        if temporary:
+            shutil.rmtree(directory)
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="headless benchmarks of database and aggregates")
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES,
+            help="numbers of generated transactions")
+    parser.add_argument('--seed', type=int, default=0, help="seed of the ledger generator")
+    parser.add_argument('--repeat', type=int, default=5, help="runs per measurement")
+    parser.add_argument('--dir', help="directory for the databases, temporary by default")
+    parser.add_argument('--backend', choices=sorted(BACKENDS), default="sqlite",
+            help="storage backend to benchmark")
+    parser.add_argument('--output', default='benchmark.json', help="path of the JSON results")
+    args = parser.parse_args()
+    results = run(args.sizes, args.seed, args.repeat, args.dir, args.backend)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=1)
+    for size, result in results["sizes"].items():
+        print(size)
+        for name, stats in result.items():
+            if "bytes" in stats:
+                print('  {:<22} {:.1f} B'.format(name, stats["bytes"]))
+            else:
+                print('  {:<22} {:.6f} s'.format(name, stats.get("median", stats.get("seconds"))))
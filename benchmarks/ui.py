@@ -0,0 +1,341 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.ledger import generate
+from model import SQLiteCRUD
+
+SIZES = (10000, 100000)
+# actions of one round, every round is replayed in this order
+SCRIPT = (
+    ("show_frame", "Graph"),
+    ("show_frame", "Table"),
+    ("add_transaction", None),
+    ("update_transaction", None),
+    ("delete_transaction", None),
+    ("show_frame", "Form"),
+    ("show_frame", "Table"),
+)
+# seconds between two checks if the app is idle
+IDLE_STEP = 0.001
+# display number of the virtual framebuffer
+XVFB_DISPLAY = ":99"
+# seconds to wait for the virtual framebuffer to accept connections
+XVFB_TIMEOUT = 10
+
+
+def percentile(values, q):
+    """q-th percentile of the values with linear interpolation
+
+    Parameters
+    ----------
+    values : list
+        measured values
+    q : float
+        percentile between 0 and 100
+    """
+
+    values = sorted(values)
+    position = (len(values) - 1) * q / 100
+    low = int(position)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (position - low)
+
+
+def start_display():
+    """start a virtual framebuffer if no display is available
+
+    Returns the Xvfb process or None if a display is already set.
+
+    Raises
+    ------
+    RuntimeError
+        If there is no display and Xvfb is not installed or does not start
+    """
+
+    if os.environ.get("DISPLAY"):
+        return None
+    if shutil.which("Xvfb") is None:
+        raise RuntimeError("No display found and Xvfb is not installed")
+    process = subprocess.Popen(["Xvfb", XVFB_DISPLAY, "-screen", "0", "1280x1024x24"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    # the server accepts connections once its socket exists
+    socket = "/tmp/.X11-unix/X" + XVFB_DISPLAY[1:]
+    deadline = time.monotonic() + XVFB_TIMEOUT
+    while not os.path.exists(socket):
+        if process.poll() is not None or time.monotonic() > deadline:
+            process.terminate()
+            raise RuntimeError("Xvfb did not start on display {}".format(XVFB_DISPLAY))
+        time.sleep(0.05)
+    os.environ["DISPLAY"] = XVFB_DISPLAY
+    return process
+
+
+def stub_messageboxes(messages):
+    """replace the message boxes of the controller, questions are confirmed
+
+    Parameters
+    ----------
+    messages : list
+        receives (kind, title, message) of every message box
+    """
+
+    import controller
+
+    def show(kind, result=None):
+        def message_box(title=None, message=None, **options):
+            messages.append((kind, title, message))
+            return result
+        return message_box
+
+    controller.tkmsg.showinfo = show("info")
+    controller.tkmsg.showerror = show("error")
+    controller.tkmsg.askokcancel = show("question", True)
+
+
+def is_busy(app):
+    """True while database requests or chart redraws are pending
+
+    Parameters
+    ----------
+    app : tkinterApp
+        the app under test
+    """
+
+    from views.graph import Graph
+
+    # pending also holds the rows fetched for the table
+    if app.pending or app.search_job is not None:
+        return True
+    graph = app.frames.get(Graph)
+    return graph is not None and graph.visible and graph.render_job is not None
+
+
+def wait_idle(app):
+    """process events until no request or redraw is pending
+
+    Parameters
+    ----------
+    app : tkinterApp
+        the app under test
+    """
+
+    app.update()
+    while is_busy(app):
+        time.sleep(IDLE_STEP)
+        app.update()
+    app.update_idletasks()
+
+
+def select_row(app):
+    """focus the first visible row of the table and return its transaction
+
+    Parameters
+    ----------
+    app : tkinterApp
+        the app under test
+    """
+
+    from views.table import Table
+
+    table = app.frames[Table]
+    children = table.trv.get_children()
+    if not children:
+        return None
+    table.trv.focus(children[0])
+    return table.selected()
+
+
+def prepare(app, action, step):
+    """fill the form or select a row before an action
+
+    The preparation is not part of the measured time.
+
+    Parameters
+    ----------
+    app : tkinterApp
+        the app under test
+    action : str
+        name of the next action
+    step : int
+        number of the action, used for unique names
+    """
+
+    from views.form import Form
+
+    if action == "add_transaction":
+        form = app.get_frame(Form)
+        form.calendars["Datum"].set_date(datetime.date(2021, 1, 1))
+        form.entries["Name"].delete(0, 'end')
+        form.entries["Name"].insert(0, "Replay {}".format(step))
+        form.entries["Preis"].delete(0, 'end')
+        form.entries["Preis"].insert(0, "12.34")
+        form.comboboxes["Typ"].set("Sonstiges")
+    elif action in ("update_transaction", "delete_transaction"):
+        transaction = select_row(app)
+        if transaction is not None and action == "update_transaction":
+            app.get_table_row()
+            form = app.frames[Form]
+            form.calendars["Datum"].set_date(datetime.date.fromisoformat(transaction.date))
+            form.entries["Name"].insert('end', " *")
+    wait_idle(app)
+
+
+def replay(db_name, rounds):
+    """replay the script on a tkinterApp and return the latencies per action
+
+    Parameters
+    ----------
+    db_name : str
+        name of an existing database file without '.db'
+    rounds : int
+        number of times the script is replayed
+    """
+
+    from controller import tkinterApp
+    from db_worker import DBWorker
+    from views.form import Form
+    from views.graph import Graph
+    from views.table import Table
+
+    views = {"Table": Table, "Form": Form, "Graph": Graph}
+    messages = []
+    stub_messageboxes(messages)
+    latencies = {}
+
+    start = time.perf_counter()
+    app = tkinterApp(DBWorker(SQLiteCRUD, db_name))
+    app.geometry("1000x450+0+0")
+    wait_idle(app)
+    latencies["startup"] = [time.perf_counter() - start]
+    try:
+        if app.model.created.exception() is not None:
+            raise app.model.created.exception()
+        for step in range(rounds):
+            for action, argument in SCRIPT:
+                prepare(app, action, step)
+                name = action if argument is None else "{}({})".format(action, argument)
+                start = time.perf_counter()
+                if argument is None:
+                    getattr(app, action)()
+                else:
+                    getattr(app, action)(views[argument])
+                wait_idle(app)
+                latencies.setdefault(name, []).append(time.perf_counter() - start)
+    finally:
+        app.destroy()
+        app.model.stop()
+    errors = [m for m in messages if m[0] == "error"]
+    return latencies, errors
+
+
+def summarize(latencies):
+    """count, p50, p95, p99 and max of the latencies of every action
+
+    Parameters
+    ----------
+    latencies : dictionary
+        measured seconds per action
+    """
+
+    return {name: {
+        "count": len(values),
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values),
+    } for name, values in latencies.items()}
+
+
+def create_ledger(directory, size, seed):
+    """create a database with a synthetic ledger and return its name
+
+    Parameters
+    ----------
+    directory : str
+        directory of the database
+    size : int
+        number of transactions
+    seed : int
+        seed of the generator
+    """
+
+    db_name = os.path.join(directory, "ui_{}".format(size))
+    if os.path.exists(db_name + ".db"):
+        os.remove(db_name + ".db")
+    model = SQLiteCRUD(db_name)
+    try:
+        model.create_items(generate(size, seed))
+    finally:
+        model.close()
+    return db_name
+
+
+def run(sizes=SIZES, rounds=20, seed=0, directory=None):
+    """replay the script for every ledger size and return the report
+
+    Parameters
+    ----------
+    sizes : list
+        numbers of transactions
+    rounds : int
+        number of times the script is replayed per size
+    seed : int
+        seed of the generator
+    directory : str
+        directory for the databases, a temporary one if None
+    """
+
+    results = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "rounds": rounds,
+        "sizes": {},
+    }
+    temporary = directory is None
+    directory = directory or tempfile.mkdtemp(prefix="benchmarks")
+    display = start_display()
+    try:
+        for size in sizes:
+            print("{} transactions".format(size), file=sys.stderr)
+            latencies, errors = replay(create_ledger(directory, size, seed), rounds)
+            results["sizes"][str(size)] = {
+                "errors": [list(e) for e in errors],
+                "actions": summarize(latencies),
+            }
+    finally:
+        if display is not None:
+            display.terminate()
+        if temporary:
+            shutil.rmtree(directory)
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="latency of the user actions until the UI is idle")
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES,
+            help="numbers of generated transactions")
+    parser.add_argument('--rounds', type=int, default=20, help="replays of the script per size")
+    parser.add_argument('--seed', type=int, default=0, help="seed of the ledger generator")
+    parser.add_argument('--dir', help="directory for the databases, temporary by default")
+    parser.add_argument('--output', default='latency.json', help="path of the JSON results")
+    args = parser.parse_args()
+    results = run(args.sizes, args.rounds, args.seed, args.dir)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=1)
+    for size, result in results["sizes"].items():
+        print(size)
+        for name, stats in result["actions"].items():
+            print('  {:<30} p50 {:.4f} s  p95 {:.4f} s  p99 {:.4f} s'.format(
+                    name, stats["p50"], stats["p95"], stats["p99"]))
+        if result["errors"]:
+            print('  {} error messages'.format(len(result["errors"])))
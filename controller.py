@@ -1,14 +1,30 @@
 import datetime
 import re
+import time
 
-from tkcalendar import Calendar, DateEntry
 import tkinter as tk
+import tkinter.filedialog as tkfile
 import tkinter.messagebox as tkmsg
 
+import profiling
+import snapshot
+from importer import CSVImporter
+from model import TRANSACTION_TYPES, TransactionAggregates, freeze
+
 from views.form import Form 
 from views.table import Table
 from views.graph import Graph
 from views.nav import Nav
+from views.filter import FilterBar
+
+# interval in ms to check for finished database requests
+POLL_INTERVAL = 20
+# delay in ms after the last keystroke before searching
+SEARCH_DELAY = 250
+# maximum number of search results
+SEARCH_LIMIT = 200
+# idle time in ms after the last change before the snapshot is written
+SNAPSHOT_DELAY = 30000
 
 
 class tkinterApp(tk.Tk):
@@ -19,13 +35,34 @@ class tkinterApp(tk.Tk):
 
     Attributes
     ----------
-    model : instance of Model-class 
-        handles connection to database
+    model : instance of DBWorker 
+        runs the database calls of the model on a worker thread
+    frames : dictionary
+        views which were shown at least once, created on first use
+    pending : list
+        database requests which are not shown yet 
+        (future, callback, error_title, name, start)
+    search_text : str
+        text of the current search, empty to show all transactions
+    snapshot : Snapshot
+        snapshot shown until the first data of the database arrives
+    snapshot_dirty : bool
+        True if the snapshot file is outdated
+    charts_stale : bool
+        True if the data changed since the charts were calculated
 
     Methods
     -------
     show_frame(cont)
         lifts frame to front        
+    get_frame(cont)
+        get a view and create it on first use
+    setup_table(frame)
+        initialise and configure the table view
+    setup_form(frame)
+        initialise and configure the form view
+    setup_graph(frame)
+        initialise and configure the graph view
     add_transaction()
         gets user data to store in the database
     get_table_row()
@@ -34,85 +71,134 @@ class tkinterApp(tk.Tk):
         get item detail and save changes to database
     delete_transaction()
         get item detail and delete item
+    import_transactions()
+        import a CSV bank statement into the database
+    schedule_search()
+        search after the user stopped typing
+    search_transactions()
+        show the transactions matching the search text
+    run_search()
+        query the results of the current search text
+    apply_filter()
+        filter table and graph by the values of the filter bar
+    reset_filter()
+        show all transactions in table and graph
+    run_async(function, callback=None, error_title="Datenbankfehler")
+        run a database request without blocking the view
+    poll_pending()
+        hand finished database requests to their callbacks
+    read_window(*args)
+        read rows for the virtual table
+    read_page(*args)
+        read the next rows for the virtual table
+    read_rows(name, args)
+        read rows for the virtual table without waiting for the database
+    read_snapshot(name, *args)
+        read rows of the snapshot while the database is busy
+    schedule_snapshot()
+        write the snapshot once the user stopped changing data
+    save_snapshot()
+        write the snapshot on the worker thread
+    write_snapshot(model)
+        write the snapshot file of the current data
+    snapshot_saved(result)
+        mark the snapshot as written
+    close_snapshot()
+        stop showing the snapshot
+    get_aggregates(model, filters)
+        totals of the filtered transactions
+    get_monthly_totals(model, filters)
+        totals per month and type of the filtered transactions
     validate(data)
         validate if price into is a number
     update_all()
         update views when chages occurred
+    reload(model, filters, charts=True)
+        calculate the data of all views
+    show_reload(data)
+        update all views with reloaded data
+    show_charts(data)
+        update all charts
     convert_price(input_price, input_type)
         convert only expenditures to negativ number
-    update_pie_graph()
-        calculate data and update pie view
-    update_bar_graph()
-        calculate data and update bar view
+    update_pie_graph(mylist)
+        update pie view
+    update_bar_graph(mylist)
+        update bar view
+    update_line_graphs(balance, spending)
+        update line chart views
+    update_analysis_graphs(trend, yoy, forecast)
+        update trend, previous year and forecast views
     """
      
-    def __init__(self, model, *args, **kwargs): 
+    def __init__(self, model, snapshot=None, snapshot_path=None, *args, **kwargs): 
         tk.Tk.__init__(self, *args, **kwargs)
         """
         Parameters
         ----------
-        model : instance of Model-class 
-            handles connection to database
+        model : instance of DBWorker 
+            runs the database calls of the model on a worker thread
+        snapshot : Snapshot
+            valid snapshot of the database to show at startup, optional
+        snapshot_path : str
+            path to write the snapshot to, optional
         frames : dictionary
             to organize views
         """
 
         self.model = model
-        self.transactions = self.model.read_items()
-        self.transaction_types = [
-            "Gehalt",
-            "Lebenshaltung",
-            "Mobilität",
-            "Sonstiges",
-            "Telekommunikation",
-            "Wohnen",
-        ]
+        self.transaction_types = list(TRANSACTION_TYPES)
+        self.filters = {}
+        self.pending = []
+        self.polling = False
+        self.fetching = None
+        self.fetched = {}
+        self.search_text = ""
+        self.search_job = None
+        self.search_generation = 0
+        self.snapshot = snapshot
+        self.snapshot_path = snapshot_path
+        self.snapshot_dirty = snapshot is None
+        self.snapshot_job = None
+        self.charts_stale = True
          
         # creating a container
         container = tk.Frame(self)  
+        self.container = container
         container.pack(side = "top", fill = "both", expand = True) 
   
         container.grid_columnconfigure(0, weight = 1)
-        container.grid_rowconfigure(1, weight = 1)
+        container.grid_rowconfigure(2, weight = 1)
 
         self.nav_bar = Nav(container, self)
         self.nav_bar.create_view()
         self.nav_bar.grid(row=0, column=0, sticky="new")
+
+        # View "FilterBar" initialise and configure
+        self.filter_bar = FilterBar(container, self)
+        self.filter_bar.create_view(self.transaction_types)
+        self.filter_bar.grid(row=1, column=0, sticky="new", padx=10)
+        self.filter_bar.buttons["Filtern"].configure(command=lambda : self.apply_filter())
+        self.filter_bar.buttons["Zuruecksetzen"].configure(command=lambda : self.reset_filter())
   
-        # initializing frames to an empty array
+        # views are created on first use, see get_frame
         self.frames = {}  
-  
-        # iterating through a tuple consisting of the different page layouts
-        for F in (Table, Form, Graph):
-            frame = F(container, self)
-            # initializing frames for views 
-            self.frames[F] = frame 
-            frame.grid(row=1, column=0, sticky="nsew")
+        self.setup = {Table: self.setup_table, Form: self.setup_form, Graph: self.setup_graph}
         
         # View "Nav" initialise and configure
         self.nav_bar.buttons["Tabelle"].configure(command=lambda : self.show_frame(Table))
         self.nav_bar.buttons["Grafik"].configure(command=lambda : self.show_frame(Graph))
         self.nav_bar.buttons["Formular"].configure(command=lambda : self.show_frame(Form))
-        
-        # View "Form" initialise  and configure
-        self.frames[Form].create_view(self.transaction_types)
-        self.frames[Form].buttons["Neu"].configure(command=lambda : self.add_transaction())
-        self.frames[Form].buttons["Aendern"].configure(command=lambda : self.update_transaction())
-        self.frames[Form].buttons["Loeschen"].configure(command=lambda : self.delete_transaction())
-
-        # View "Table" initialise and configure
-        self.frames[Table].create_view()
-        self.frames[Table].update(self.transactions)
-        self.frames[Table].trv.bind('<Double 1>', lambda e: self.get_table_row())
-
-        # View "Graph" initialise and configure
-        self.frames[Graph].create_view()
-        self.update_pie_graph()
-        self.update_bar_graph()
-
-        # show initial View
+        self.nav_bar.buttons["Import"].configure(command=lambda : self.import_transactions())
+
+        # show initial View, only the table data is loaded at startup
         self.show_frame(Table)
+        self.update_all()
+        if self.snapshot is not None:
+            # paint from the snapshot while the database is opened
+            self.frames[Table].update_pages(self.snapshot.count)
   
+    @profiling.timed
     def show_frame(self, cont):
         """to display the current frame passed as parameter
 
@@ -122,9 +208,72 @@ class tkinterApp(tk.Tk):
             tk.Frame to show on top 
         """
         
-        frame = self.frames[cont]
+        frame = self.get_frame(cont)
         frame.tkraise()
+        # charts are only calculated and drawn while visible
+        if Graph in self.frames:
+            self.frames[Graph].set_visible(cont is Graph)
+        if cont is Graph and self.charts_stale:
+            self.update_all()
+
+    def get_frame(self, cont):
+        """get a view and create it on first use
+
+        Parameters
+        ----------
+        cont : View class
+            class of the view
+        """
+        if cont not in self.frames:
+            frame = cont(self.container, self)
+            self.frames[cont] = frame
+            frame.grid(row=2, column=0, sticky="nsew")
+            self.setup[cont](frame)
+        return self.frames[cont]
+
+    def setup_table(self, frame):
+        """initialise and configure the table view
+
+        Parameters
+        ----------
+        frame : Table
+            the new table view
+        """
+        frame.create_view()
+        frame.set_source(self.read_window, self.read_page)
+        frame.entries["Suche"].bind('<KeyRelease>', lambda e: self.schedule_search())
+        frame.trv.bind('<Double 1>', lambda e: self.get_table_row())
+
+    def setup_form(self, frame):
+        """initialise and configure the form view
+
+        The calendar (tkcalendar and Babel) is loaded here, not at startup.
+
+        Parameters
+        ----------
+        frame : Form
+            the new form view
+        """
+        frame.create_view(self.transaction_types)
+        frame.buttons["Neu"].configure(command=lambda : self.add_transaction())
+        frame.buttons["Aendern"].configure(command=lambda : self.update_transaction())
+        frame.buttons["Loeschen"].configure(command=lambda : self.delete_transaction())
+
+    def setup_graph(self, frame):
+        """initialise and configure the graph view
+
+        The chart data is calculated by show_frame once the graph is raised.
+
+        Parameters
+        ----------
+        frame : Graph
+            the new graph view
+        """
+        frame.create_view()
+        if self.snapshot is not None and not self.filters:
+            self.show_charts(self.snapshot.charts)
     
+    @profiling.timed
     def add_transaction(self):
         """to add a new transaction to the database an display
         the updated list
@@ -142,8 +291,9 @@ class tkinterApp(tk.Tk):
             return
         else:
             input_price = self.convert_price(input_price,input_type)
-            self.model.create_item(str(input_date), input_name, input_price, input_type)
-            tkmsg.showinfo(title='Neue Transaktion', message=f'{input_name} vom Typ {input_type} mit {input_price} EUR wurde hinzugefügt')
+            self.run_async(lambda model: model.create_item(str(input_date), input_name, input_price, input_type),
+                    lambda result: tkmsg.showinfo(title='Neue Transaktion', message=f'{input_name} vom Typ {input_type} mit {input_price} EUR wurde hinzugefügt'))
+            self.schedule_snapshot()
         self.update_all()
         # clear form input-fields
         self.frames[Form].calendars["Datum"].delete(0, 'end')
@@ -151,6 +301,7 @@ class tkinterApp(tk.Tk):
         self.frames[Form].entries["Preis"].delete(0, 'end')
         self.frames[Form].comboboxes["Typ"].set('')
 
+    @profiling.timed
     def get_table_row(self):
         """get item detail from table view und populate form 
 
@@ -159,19 +310,24 @@ class tkinterApp(tk.Tk):
         self.frames[Form].entries["Name"].delete(0, 'end')
         self.frames[Form].entries["Preis"].delete(0, 'end')
 
-        item = self.frames[Table].trv.item(self.frames[Table].trv.focus())
-        self.frames[Form].datevar.set(item['values'][2])
-        self.frames[Form].entries["Name"].insert(0, item['values'][3])
-        input_price = self.convert_price(item['values'][4], item['values'][5])
+        transaction = self.frames[Table].selected()
+        if transaction is None:
+            return
+        self.frames[Form].datevar.set(transaction.date)
+        self.frames[Form].entries["Name"].insert(0, transaction.name)
+        input_price = self.convert_price(transaction.price, transaction.type)
         self.frames[Form].entries["Preis"].insert(0, input_price)
-        self.frames[Form].comboboxes["Typ"].set(item['values'][5])
+        self.frames[Form].comboboxes["Typ"].set(transaction.type)
         
+    @profiling.timed
     def update_transaction(self):
         """get item detail and save changes to database
 
         """
-        item = self.frames[Table].trv.item(self.frames[Table].trv.focus())
-        input_id = item['values'][1]
+        transaction = self.frames[Table].selected()
+        if transaction is None:
+            return
+        input_id = transaction.rowid
         input_date = self.frames[Form].calendars["Datum"].get_date()
         input_name = self.frames[Form].entries["Name"].get()
         input_price = self.frames[Form].entries["Preis"].get()
@@ -186,21 +342,326 @@ class tkinterApp(tk.Tk):
         else:
             if tkmsg.askokcancel(title="Aendern", message="Wirklich ändern?"):
                 input_price = self.convert_price(input_price,input_type)
-                self.model.update_item(input_id, input_date, input_name, 
-                        input_price, input_type)
+                self.run_async(lambda model: model.update_item(input_id, input_date, input_name, 
+                        input_price, input_type))
+                self.schedule_snapshot()
         self.update_all()
         self.show_frame(Table)
 
+    @profiling.timed
     def delete_transaction(self):
         """get item detail and delete item
 
         """
-        item = self.frames[Table].trv.item(self.frames[Table].trv.focus())
+        transaction = self.frames[Table].selected()
+        if transaction is None:
+            return
         if tkmsg.askokcancel(title="Loeschen", message="Wirklich entfernen?"):
-            self.model.delete_item(item['values'][1])
+            input_id = transaction.rowid
+            self.run_async(lambda model: model.delete_item(input_id))
+            self.schedule_snapshot()
         self.update_all()
         self.show_frame(Table)
     
+    @profiling.timed
+    def import_transactions(self):
+        """import a CSV bank statement into the database
+
+        """
+        path = tkfile.askopenfilename(title="CSV Import",
+                filetypes=[("CSV", "*.csv"), ("Alle Dateien", "*.*")])
+        if not path:
+            return
+
+        def show_stats(stats):
+            tkmsg.showinfo(title='CSV Import', message=f'{stats["rows"]} Transaktionen importiert, '
+                    f'{stats["skipped"]} übersprungen ({stats["rows_per_second"]:.0f} Zeilen/s)')
+
+        self.run_async(lambda model: CSVImporter(model, self.transaction_types).run(path),
+                show_stats, error_title="Importfehler")
+        self.schedule_snapshot()
+        self.update_all()
+
+    def run_async(self, function, callback=None, error_title="Datenbankfehler"):
+        """run a database request without blocking the view and return its Future
+
+        The request runs on the worker thread, the callback is called with
+        the result on the Tk thread. Requests finish in the order they are
+        submitted.
+
+        Parameters
+        ----------
+        function : callable
+            function(model) to run on the worker thread
+        callback : callable
+            callback(result) to run on the Tk thread, optional
+        error_title : str
+            title of the error message if the request or its callback fails
+        """
+        # with profiling the time until the callback finished is recorded
+        start = time.perf_counter() if profiling.enabled() else None
+        future = self.model.submit(function)
+        self.pending.append((future, callback, error_title,
+                "request " + function.__qualname__, start))
+        if not self.polling:
+            self.polling = True
+            self.after(POLL_INTERVAL, self.poll_pending)
+        return future
+
+    def poll_pending(self):
+        """hand finished database requests to their callbacks
+
+        Errors of a request or its callback are shown, polling goes on
+        with the next request.
+        """
+        try:
+            while self.pending and self.pending[0][0].done():
+                future, callback, error_title, name, start = self.pending.pop(0)
+                try:
+                    result = future.result()
+                    if callback is not None:
+                        callback(result)
+                except Exception as e:
+                    tkmsg.showerror(title=error_title, message=str(e))
+                    continue
+                if start is not None:
+                    profiling.record(name, start, time.perf_counter() - start)
+        finally:
+            if self.pending:
+                self.after(POLL_INTERVAL, self.poll_pending)
+            else:
+                self.polling = False
+
+    def read_window(self, *args):
+        """read rows for the virtual table
+
+        """
+        return self.read_rows("read_window", args)
+
+    def read_page(self, *args):
+        """read the next rows for the virtual table
+
+        """
+        return self.read_rows("read_page", args)
+
+    def read_rows(self, name, args):
+        """read rows for the virtual table without waiting for the database
+
+        The rows are read from the snapshot if possible, otherwise they are
+        requested on the worker thread and None is returned, so the table
+        keeps its rows. Once the rows arrive the table renders again and
+        gets them from here.
+
+        Parameters
+        ----------
+        name : str
+            "read_window" or "read_page"
+        args : tuple
+            arguments of the table for the read method of the model
+        """
+        key = (name, args, freeze(self.filters))
+        if key in self.fetched:
+            return self.fetched.pop(key)
+        rows = self.read_snapshot(name, *args)
+        if rows is not None:
+            return rows
+        if self.fetching is not None and self.fetching[0] == key and not self.fetching[1].done():
+            return None
+        filters = dict(self.filters)
+
+        def show_rows(rows):
+            # only the latest request is shown, older ones were scrolled past
+            if self.fetching is not None and self.fetching[0] == key:
+                self.fetching = None
+                self.fetched = {key: rows}
+                self.frames[Table].render()
+
+        self.fetching = (key, self.run_async(
+                lambda model: getattr(model, name)(*args, filters=filters), show_rows))
+        return None
+
+    def read_snapshot(self, name, *args):
+        """read rows of the snapshot while the database is busy
+
+        Returns None if there is no snapshot or it can not be read in the
+        order of the table.
+
+        Parameters
+        ----------
+        name : str
+            "read_window" or "read_page"
+        """
+        if self.snapshot is None:
+            return None
+        return getattr(self.snapshot, name)(*args, filters=self.filters)
+
+    def schedule_snapshot(self):
+        """write the snapshot once the user stopped changing data
+
+        """
+        self.snapshot_dirty = True
+        if self.snapshot_job is not None:
+            self.after_cancel(self.snapshot_job)
+        self.snapshot_job = self.after(SNAPSHOT_DELAY, self.save_snapshot)
+
+    def save_snapshot(self):
+        """write the snapshot on the worker thread, waits for running requests
+
+        The write is a pending request, so the table does not wait for the
+        worker while it runs. A failed write is reported and retried with
+        the next change or on exit.
+        """
+        self.snapshot_job = None
+        if self.pending:
+            self.snapshot_job = self.after(SNAPSHOT_DELAY, self.save_snapshot)
+            return
+        self.run_async(self.write_snapshot, self.snapshot_saved, error_title="Snapshotfehler")
+
+    def snapshot_saved(self, result):
+        """mark the snapshot as written unless the data changed since
+
+        Parameters
+        ----------
+        result : None
+            result of write_snapshot
+        """
+        if self.snapshot_job is None:
+            self.snapshot_dirty = False
+
+    def write_snapshot(self, model):
+        """write the snapshot file of the current data, runs on the worker thread
+
+        Parameters
+        ----------
+        model : instance of Model-class 
+            handles connection to database
+        """
+        if self.snapshot_path is not None:
+            snapshot.write(self.snapshot_path, model, self.reload(model, {}))
+
+    def close_snapshot(self):
+        """stop showing the snapshot
+
+        """
+        if self.snapshot is not None:
+            self.snapshot.close()
+            self.snapshot = None
+
+    def schedule_search(self):
+        """search after the user stopped typing
+
+        """
+        if self.search_job is not None:
+            self.after_cancel(self.search_job)
+        self.search_job = self.after(SEARCH_DELAY, self.search_transactions)
+
+    @profiling.timed
+    def search_transactions(self):
+        """show the transactions matching the search text
+
+        An empty search text switches back to the paged table.
+        """
+        self.search_job = None
+        text = self.frames[Table].entries["Suche"].get().strip()
+        if text == self.search_text:
+            return
+        self.search_text = text
+        if not text:
+            self.search_generation += 1
+            self.frames[Table].set_source(self.read_window, self.read_page)
+            self.update_all()
+            return
+        self.run_search()
+
+    def run_search(self):
+        """query the results of the current search text
+
+        """
+        self.search_generation += 1
+        generation = self.search_generation
+        text = self.search_text
+        filters = dict(self.filters)
+
+        def show_results(rows):
+            # ignore results of outdated searches
+            if generation == self.search_generation:
+                self.frames[Table].update(rows)
+
+        self.run_async(lambda model: model.search_items(text, SEARCH_LIMIT, filters), show_results)
+
+    @profiling.timed
+    def apply_filter(self):
+        """filter table and graph by the values of the filter bar
+
+        """
+        filters = {}
+        try:
+            for label, name in (("Von", "date_from"), ("Bis", "date_to")):
+                value = self.filter_bar.entries[label].get().strip()
+                if value:
+                    filters[name] = str(datetime.datetime.strptime(value, '%d.%m.%Y').date())
+            for label, name in (("Betrag min", "price_min"), ("Betrag max", "price_max")):
+                value = self.filter_bar.entries[label].get().strip()
+                if value:
+                    filters[name] = float(value.replace(',', '.'))
+        except ValueError:
+            tkmsg.showerror(title="Filter", message="bitte Datum als tt.mm.jjjj und Betrag als Zahl eingeben")
+            return
+        types = self.filter_bar.get_selection("Typ")
+        if types:
+            filters["types"] = types
+        self.filters = filters
+        self.frames[Table].offset = 0
+        self.update_all()
+
+    @profiling.timed
+    def reset_filter(self):
+        """show all transactions in table and graph
+
+        """
+        self.filter_bar.clear()
+        self.filters = {}
+        self.frames[Table].offset = 0
+        self.update_all()
+
+    def get_aggregates(self, model, filters):
+        """totals of the filtered transactions, runs on the worker thread
+
+        Without filters the running totals of the model are used.
+
+        Parameters
+        ----------
+        model : instance of Model-class 
+            handles connection to database
+        filters : dictionary
+            filters of table and graph
+        """
+        if not filters:
+            return model.aggregates
+        aggregates = TransactionAggregates()
+        aggregates.load(model.read_totals_by_type(filters), 
+                model.read_totals_by_sign(filters))
+        return aggregates
+
+    @profiling.timed
+    def get_monthly_totals(self, model, filters):
+        """totals per month and type of the filtered transactions, runs on the worker thread
+
+        The sums are grouped by the database, so only one row per month
+        and type is loaded.
+
+        Parameters
+        ----------
+        model : instance of Model-class 
+            handles connection to database
+        filters : dictionary
+            filters of table and graph
+        """
+        # analytics loads NumPy, import it when the charts are calculated
+        from analytics import MonthlyTotals
+        return MonthlyTotals.from_rows(
+                model.read_totals_by_month_and_type(filters), self.transaction_types)
+
     def validate(self, data):
         """validate if price into is a number
 
@@ -213,14 +674,77 @@ class tkinterApp(tk.Tk):
         if match is not None:
             return True            
 
+    @profiling.timed
     def update_all(self):
         """update views when chages occurred
 
+        The charts are only calculated while the graph is visible, otherwise
+        they are marked as stale and calculated when it is shown.
         """
-        self.transactions = self.model.read_items()
-        self.frames[Table].update(self.transactions)
-        self.update_pie_graph()
-        self.update_bar_graph()
+        filters = dict(self.filters)
+        charts = Graph in self.frames and self.frames[Graph].visible
+        self.charts_stale = not charts
+        self.run_async(lambda model: self.reload(model, filters, charts), self.show_reload)
+
+    @profiling.timed
+    def reload(self, model, filters, charts=True):
+        """calculate the data of all views, runs on the worker thread
+
+        Parameters
+        ----------
+        model : instance of Model-class 
+            handles connection to database
+        filters : dictionary
+            filters of table and graph
+        charts : bool
+            False to skip the data of the charts
+        """
+        data = {"total": model.count_items(filters)}
+        if charts:
+            aggregates = self.get_aggregates(model, filters)
+            data["pie"] = aggregates.pie_data(self.transaction_types)
+            data["bar"] = aggregates.bar_data()
+            data["balance"] = model.read_balance(filters)
+            data["spending"] = model.read_spending(self.transaction_types, filters)
+            monthly = self.get_monthly_totals(model, filters)
+            data["trend"] = monthly.trend(self.transaction_types[0])
+            data["yoy"] = monthly.year_over_year(self.transaction_types[0])
+            data["forecast"] = list(monthly.projection(data["balance"]))
+        return data
+
+    @profiling.timed
+    def show_reload(self, data):
+        """update all views with reloaded data
+
+        Parameters
+        ----------
+        data : dictionary
+            number of rows and data of the charts
+        """
+        self.close_snapshot()
+        # rows fetched before the reload may be outdated
+        self.fetched = {}
+        self.frames[Table].update_pages(data["total"])
+        if self.search_text:
+            # show changes in the search results as well
+            self.run_search()
+        if "pie" in data:
+            self.show_charts(data)
+
+    def show_charts(self, data):
+        """update all charts
+
+        Parameters
+        ----------
+        data : dictionary
+            data of the charts
+        """
+        self.update_pie_graph(data["pie"])
+        self.update_bar_graph(data["bar"])
+        self.update_line_graphs(data["balance"], data["spending"])
+        if "trend" in data:
+            # snapshots of older versions have no analysis
+            self.update_analysis_graphs(data["trend"], data["yoy"], data["forecast"])
 
     def convert_price(self, input_price, input_type):
         """convert only expenditures to negativ number
@@ -237,34 +761,51 @@ class tkinterApp(tk.Tk):
                 return float(input_price) * -1        
         return float(input_price)
 
-    def update_pie_graph(self):
-        """calculate data and update pie view
+    def update_pie_graph(self, mylist):
+        """update pie view
 
+        Parameters
+        ----------
+        mylist : list
+            type and amount of expenditures
         """
-        mylist = []
-        for tt in self.transaction_types[1:]: # dismiss 'Gehalt' from list -> income not expenditure!
-            sum_counter = 0
-            for i in self.transactions:
-                if tt == i[4]:# and tt != 'Gehalt':
-                    sum_counter += i[3]
-            if sum_counter < 0:
-                mylist.append([tt, abs(sum_counter)])
-        self.frames[Graph].draw_pie(mylist)
+        self.frames[Graph].schedule("pie", mylist)
     
-    def update_bar_graph(self):
-        """calculate data and update bar view
-
-        """
-        mylist = []
-        sum_total = 1
-        sum_expenditure = 0
-        sum_income = 0
-        for ta in self.transactions:
-            sum_total += abs(ta[3])
-            if ta[3] < 0:
-                sum_expenditure += ta[3]
-            else:
-                sum_income += ta[3]
-        mylist.append(['Ausgaben', abs(sum_expenditure / sum_total)])
-        mylist.append(['Einnahmen', sum_income / sum_total])
-        self.frames[Graph].draw_bar(mylist)
+    def update_bar_graph(self, mylist):
+        """update bar view
+
+        Parameters
+        ----------
+        mylist : list
+            ratio of expenditures and income
+        """
+        self.frames[Graph].schedule("bar", mylist)
+
+    def update_line_graphs(self, balance, spending):
+        """update line chart views
+
+        Parameters
+        ----------
+        balance : list
+            date ordinal and balance
+        spending : list
+            month number and expenditures
+        """
+        self.frames[Graph].schedule("balance", balance)
+        self.frames[Graph].schedule("spending", spending)
+
+    def update_analysis_graphs(self, trend, yoy, forecast):
+        """update trend, previous year and forecast views
+
+        Parameters
+        ----------
+        trend : list
+            category and its rolling average expenditures per month
+        yoy : list
+            month number and change of expenditures to the previous year
+        forecast : list
+            balance of the month and its projection to the month end
+        """
+        self.frames[Graph].schedule("trend", trend)
+        self.frames[Graph].schedule("yoy", yoy)
+        self.frames[Graph].schedule("forecast", forecast)
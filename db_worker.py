@@ -0,0 +1,109 @@
+import queue
+import threading
+from concurrent.futures import Future
+
+
+class DBWorker(object):
+    """
+    DBWorker class used to run all database calls on a dedicated thread
+
+    The worker thread creates the model and owns its sqlite connection.
+    Requests are queued and executed one after another, so writes stay
+    serialized. Every request returns a Future. If the model can not be
+    created, every request fails with the error of the creation.
+
+    ...
+
+    Attributes
+    ----------
+    requests : queue.Queue
+        pending requests (future, function, args, kwargs)
+    thread : threading.Thread
+        thread which owns the model
+    created : Future
+        creation of the model
+
+    Methods
+    -------
+    submit(function, *args, **kwargs)
+        queue function(model, *args, **kwargs) and return a Future
+    stop()
+        finish the pending requests and stop the thread
+    """
+
+    def __init__(self, factory, *args, **kwargs):
+        """
+        Parameters
+        ----------
+        factory : callable
+            creates the model on the worker thread, e.g. SQLiteCRUD
+        args, kwargs :
+            arguments for the factory
+        """
+
+        self.requests = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name="DBWorker", daemon=True)
+        self._model = None
+        self.created = None
+        self.created = self.submit(lambda model: self._create(factory, *args, **kwargs))
+        self.thread.start()
+
+    def _create(self, factory, *args, **kwargs):
+        self._model = factory(*args, **kwargs)
+
+    def _run(self):
+        while True:
+            request = self.requests.get()
+            if request is None:
+                # the connection belongs to this thread, close it here
+                if self._model is not None:
+                    self._model.close()
+                break
+            future, function, args, kwargs = request
+            if not future.set_running_or_notify_cancel():
+                continue
+            if future is not self.created and self.created.exception() is not None:
+                future.set_exception(self.created.exception())
+                continue
+            try:
+                future.set_result(function(self._model, *args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+    def submit(self, function, *args, **kwargs):
+        """queue function(model, *args, **kwargs) and return a Future
+
+        Parameters
+        ----------
+        function : callable
+            function to run on the worker thread with the model
+        args, kwargs :
+            further arguments for the function
+
+        Raises
+        ------
+        Exception
+            The error of the creation if the model could not be created
+        """
+
+        if self.created is not None and self.created.done() \
+                and self.created.exception() is not None:
+            raise self.created.exception()
+        future = Future()
+        if threading.current_thread() is self.thread:
+            # called from a request, run at once instead of waiting for itself
+            try:
+                future.set_result(function(self._model, *args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+            return future
+        self.requests.put((future, function, args, kwargs))
+        return future
+
+    def stop(self):
+        """finish the pending requests, close the model and stop the thread
+
+        """
+
+        self.requests.put(None)
+        self.thread.join()
@@ -0,0 +1,232 @@
+import codecs
+import csv
+import datetime
+import sys
+import time
+
+# column mapping of a common german bank export (CSV-Umsatzanzeige)
+DEFAULT_MAPPING = {
+    "date": "Buchungstag",
+    "name": "Verwendungszweck",
+    "price": "Betrag",
+    "type": None,
+}
+
+
+class CSVImporter(object):
+    """
+    CSVImporter class used to import bank statements into the database
+
+    The file is parsed as a stream and inserted in batches, so the memory
+    use does not depend on the size of the file. The lines are decoded one
+    by one, so a decoding error names its line.
+
+    ...
+
+    Attributes
+    ----------
+    model : instance of Model-class
+        handles connection to database
+    mapping : dictionary
+        column for "date", "name", "price" and "type", either the header
+        name or the index of the column, "type" may be None
+    transaction_types : list
+        valid types, the first one is used for income
+    default_type : str
+        type for expenditures without a valid type
+    delimiter : str
+        delimiter of the CSV file
+    date_format : str
+        format of the dates in the CSV file
+    decimal_comma : bool
+        True if amounts are written like 1.234,56
+    encoding : str
+        encoding of the CSV file
+    errors : str
+        handling of undecodable bytes, "strict" to stop the import or
+        "replace" to import them as U+FFFD
+    batch_size : int
+        number of rows inserted at once
+    skipped : int
+        number of rows which could not be converted
+
+    Methods
+    -------
+    run(path)
+        import a CSV file and return the statistics
+    read_rows(path)
+        read the converted rows of a CSV file
+    decode_lines(f)
+        decode the lines of a binary file
+    convert(row, columns)
+        convert a CSV row to the item details
+    """
+
+    def __init__(self, model, transaction_types, mapping=None, default_type="Sonstiges",
+            delimiter=";", date_format="%d.%m.%Y", decimal_comma=True,
+            encoding="utf-8-sig", errors="strict", batch_size=1000):
+        """
+        Parameters
+        ----------
+        model : instance of Model-class
+            handles connection to database
+        transaction_types : list
+            valid types, the first one is used for income
+        mapping : dictionary
+            column for "date", "name", "price" and "type"
+        default_type : str
+            type for expenditures without a valid type
+        delimiter : str
+            delimiter of the CSV file
+        date_format : str
+            format of the dates in the CSV file
+        decimal_comma : bool
+            True if amounts are written like 1.234,56
+        encoding : str
+            encoding of the CSV file
+        errors : str
+            handling of undecodable bytes, "strict" or "replace"
+        batch_size : int
+            number of rows inserted at once
+        """
+
+        self.model = model
+        self.transaction_types = transaction_types
+        self.mapping = dict(DEFAULT_MAPPING, **(mapping or {}))
+        self.default_type = default_type
+        self.delimiter = delimiter
+        self.date_format = date_format
+        self.decimal_comma = decimal_comma
+        self.encoding = encoding
+        self.errors = errors
+        self.batch_size = batch_size
+        self.skipped = 0
+
+    def run(self, path):
+        """import a CSV file and return the statistics
+
+        Parameters
+        ----------
+        path : str
+            path of the CSV file
+        """
+
+        self.skipped = 0
+        start = time.perf_counter()
+        rows = self.model.create_items(self.read_rows(path), batch_size=self.batch_size)
+        seconds = time.perf_counter() - start
+        return {
+            "rows": rows,
+            "skipped": self.skipped,
+            "seconds": seconds,
+            "rows_per_second": rows / seconds if seconds else 0,
+        }
+
+    def read_rows(self, path):
+        """read the converted rows of a CSV file
+
+        Parameters
+        ----------
+        path : str
+            path of the CSV file
+
+        Raises
+        ------
+        ValueError
+            If a line can not be decoded and errors is "strict"
+        """
+
+        with open(path, "rb") as f:
+            reader = csv.reader(self.decode_lines(f), delimiter=self.delimiter)
+            columns = self.resolve_columns(reader)
+            for row in reader:
+                try:
+                    yield self.convert(row, columns)
+                except (ValueError, IndexError):
+                    self.skipped += 1
+
+    def decode_lines(self, f):
+        """decode the lines of a binary file
+
+        Parameters
+        ----------
+        f : file
+            CSV file opened in binary mode
+
+        Raises
+        ------
+        ValueError
+            If a line can not be decoded and errors is "strict"
+        """
+
+        decoder = codecs.getincrementaldecoder(self.encoding)(self.errors)
+        number = 0
+        for number, line in enumerate(f, 1):
+            try:
+                yield decoder.decode(line)
+            except UnicodeDecodeError as e:
+                raise ValueError('Can\'t decode line {} as {}: {}'
+                        .format(number, self.encoding, e.reason)) from None
+        try:
+            rest = decoder.decode(b"", final=True)
+        except UnicodeDecodeError as e:
+            raise ValueError('Can\'t decode line {} as {}: {}'
+                    .format(number, self.encoding, e.reason)) from None
+        if rest:
+            yield rest
+
+    def resolve_columns(self, reader):
+        """helper-method to get the column index for every field
+
+        The header row is only read if the mapping uses column names.
+
+        Parameters
+        ----------
+        reader : csv.reader
+            reader of the CSV file
+        """
+
+        if all(c is None or isinstance(c, int) for c in self.mapping.values()):
+            return dict(self.mapping)
+        header = [h.strip() for h in next(reader, [])]
+        columns = {}
+        for field, column in self.mapping.items():
+            if isinstance(column, str):
+                if column not in header:
+                    raise ValueError('Column "{}" not found in CSV header'.format(column))
+                column = header.index(column)
+            columns[field] = column
+        return columns
+
+    def convert(self, row, columns):
+        """convert a CSV row to the item details
+
+        Parameters
+        ----------
+        row : list
+            fields of the CSV row
+        columns : dictionary
+            column index for every field
+        """
+
+        date = datetime.datetime.strptime(row[columns["date"]].strip(), self.date_format)
+        name = row[columns["name"]].strip()
+        price = row[columns["price"]].strip()
+        if self.decimal_comma:
+            price = price.replace(".", "").replace(",", ".")
+        price = float(price)
+        input_type = None
+        if columns["type"] is not None:
+            input_type = row[columns["type"]].strip()
+        if input_type not in self.transaction_types:
+            input_type = self.transaction_types[0] if price >= 0 else self.default_type
+        return (str(date.date()), name, price, input_type)
+
+
+if __name__ == '__main__':
+    from model import SQLiteCRUD, TRANSACTION_TYPES
+
+    for path in sys.argv[1:]:
+        stats = CSVImporter(SQLiteCRUD(), TRANSACTION_TYPES).run(path)
+        print('{}: {rows} rows in {seconds:.2f} s ({rows_per_second:.0f} rows/s), {skipped} skipped'
+                .format(path, **stats))
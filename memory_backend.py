@@ -0,0 +1,762 @@
+import math
+import re
+import unicodedata
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from contextlib import contextmanager
+from itertools import islice
+
+import mvc_exceptions as mvc_exc
+from backend import FILTER_NAMES, SORT_COLUMNS, StorageBackend
+
+# deleted slots are removed once there are more than this many and more
+# deleted than stored records
+COMPACT_MIN = 1000
+# words of a name for the search, like the unicode61 tokenizer of fts5
+WORD = re.compile(r'\w+')
+# price column value of a NULL price
+NAN = float('nan')
+
+
+def fold(text):
+    """lower case text without diacritics, like the unicode61 tokenizer of fts5
+
+    Parameters
+    ----------
+    text : str
+        name or search text
+    """
+
+    return ''.join(c for c in unicodedata.normalize('NFKD', text)
+            if not unicodedata.combining(c)).lower()
+
+
+def index_key(value, rowid):
+    """key of a record in a sorted index, NULL values sort first like in SQLite
+
+    Parameters
+    ----------
+    value : object
+        value of the sort column, None for NULL
+    rowid : int
+        rowid of the record
+    """
+
+    return (value is not None, value, rowid)
+
+
+class MemoryTable(object):
+    """
+    MemoryTable class used to store the records of one table in columns
+
+    Every record has a slot, the position in the column arrays. Slots are
+    appended in rowid order. A deleted record only marks its slot as
+    deleted, so a rollback can restore it at the same position; deleted
+    slots are removed by compact().
+
+    ...
+
+    Attributes
+    ----------
+    rowids : array
+        rowid of every slot, ascending
+    dates : list
+        date (yyyy-mm-dd) of every slot
+    names : list
+        name of every slot
+    prices : array
+        price of every slot, NaN for a NULL price
+    types : array
+        type code of every slot
+    type_names : list
+        type of every type code
+    type_codes : dictionary
+        type code of every type
+    alive : bytearray
+        1 if the slot holds a record, 0 if it was deleted
+    live : int
+        number of records
+    next_rowid : int
+        rowid of the next record, only the rowids of rolled back inserts
+        are used again like by SQLite
+    indexes : dictionary
+        sorted list of index_key() per column, built on first use and
+        dropped by bulk writes
+    monthly : dictionary
+        [sum, count] per (month, type)
+    generation : int
+        number of writes
+
+    Methods
+    -------
+    find(rowid)
+        slot of a rowid, also for deleted records
+    record(slot)
+        record (rowid, idate, name, price, type) of a slot
+    insert(date, name, price, type)
+        append a record and return its slot
+    remove(slot)
+        mark the record of a slot as deleted
+    revive(slot)
+        restore the deleted record of a slot
+    drop_last()
+        remove the last slot of a rolled back insert
+    price(slot)
+        price of a slot, None for a NULL price
+    set(slot, date, name, price, type)
+        change the record of a slot
+    compact()
+        remove the deleted slots
+    drop_indexes()
+        drop the sorted indexes before many writes
+    index(column)
+        sorted index_key() list of a column
+    matcher(filters)
+        function to test if the record of a slot matches filters
+    slots(order, descending, after, filters)
+        slots in sort order following a sort key
+    """
+
+    def __init__(self):
+        self.rowids = array('q')
+        self.dates = []
+        self.names = []
+        self.prices = array('d')
+        self.types = array('H')
+        self.type_names = []
+        self.type_codes = {}
+        self.alive = bytearray()
+        self.live = 0
+        self.next_rowid = 1
+        self.indexes = {}
+        self.monthly = {}
+        self.generation = 0
+
+    def find(self, rowid):
+        """slot of a rowid, also for deleted records, None if unknown
+
+        Parameters
+        ----------
+        rowid : int
+            rowid of the record
+        """
+
+        slot = bisect_left(self.rowids, rowid)
+        if slot < len(self.rowids) and self.rowids[slot] == rowid:
+            return slot
+        return None
+
+    def record(self, slot):
+        """record (rowid, idate, name, price, type) of a slot
+
+        Parameters
+        ----------
+        slot : int
+            position in the columns
+        """
+
+        return (self.rowids[slot], self.dates[slot], self.names[slot], self.price(slot),
+                self.type_names[self.types[slot]])
+
+    def price(self, slot):
+        """price of a slot, None for a NULL price
+
+        Parameters
+        ----------
+        slot : int
+            position in the columns
+        """
+
+        price = self.prices[slot]
+        return None if math.isnan(price) else price
+
+    def value(self, slot, column):
+        """helper-method to get a value of a slot
+
+        Parameters
+        ----------
+        slot : int
+            position in the columns
+        column : str
+            name of the column
+        """
+
+        if column == 'idate':
+            return self.dates[slot]
+        if column == 'name':
+            return self.names[slot]
+        if column == 'price':
+            return self.price(slot)
+        if column == 'type':
+            return self.type_names[self.types[slot]]
+        return self.rowids[slot]
+
+    def type_code(self, type):
+        """helper-method to get the code of a type, new types get a new code
+
+        Parameters
+        ----------
+        type : str
+            type of a record
+        """
+
+        code = self.type_codes.get(type)
+        if code is None:
+            code = self.type_codes[type] = len(self.type_names)
+            self.type_names.append(type)
+        return code
+
+    def insert(self, date, name, price, type):
+        """append a record and return its slot
+
+        Parameters
+        ----------
+        date : str
+            date (yyyy-mm-dd)
+        name : str
+            name of the transaction
+        price : float
+            price, negative for expenditures
+        type : str
+            type of the transaction
+        """
+
+        self.rowids.append(self.next_rowid)
+        self.next_rowid += 1
+        self.dates.append(str(date))
+        self.names.append(name)
+        self.prices.append(NAN if price is None else price)
+        self.types.append(self.type_code(type))
+        self.alive.append(0)
+        slot = len(self.rowids) - 1
+        self.revive(slot)
+        return slot
+
+    def remove(self, slot):
+        """mark the record of a slot as deleted
+
+        Parameters
+        ----------
+        slot : int
+            position in the columns
+        """
+
+        self.alive[slot] = 0
+        self.live -= 1
+        self.count(slot, -1)
+
+    def revive(self, slot):
+        """restore the deleted record of a slot
+
+        Parameters
+        ----------
+        slot : int
+            position in the columns
+        """
+
+        self.alive[slot] = 1
+        self.live += 1
+        self.count(slot, 1)
+
+    def drop_last(self):
+        """remove the last slot of a rolled back insert
+
+        The rowid of the slot becomes the next rowid again.
+        """
+
+        slot = len(self.rowids) - 1
+        if self.alive[slot]:
+            self.remove(slot)
+        self.next_rowid = self.rowids.pop()
+        self.dates.pop()
+        self.names.pop()
+        self.prices.pop()
+        self.types.pop()
+        self.alive.pop()
+
+    def set(self, slot, date, name, price, type):
+        """change the record of a slot
+
+        Parameters
+        ----------
+        slot : int
+            position in the columns
+        date : str
+            date (yyyy-mm-dd)
+        name : str
+            name of the transaction
+        price : float
+            price, negative for expenditures
+        type : str
+            type of the transaction
+        """
+
+        self.count(slot, -1)
+        self.dates[slot] = str(date)
+        self.names[slot] = name
+        self.prices[slot] = NAN if price is None else price
+        self.types[slot] = self.type_code(type)
+        self.count(slot, 1)
+
+    def count(self, slot, sign):
+        """helper-method to add (1) or remove (-1) a slot to indexes and totals
+
+        Parameters
+        ----------
+        slot : int
+            position in the columns
+        sign : int
+            1 to add, -1 to remove
+        """
+
+        self.generation += 1
+        rowid = self.rowids[slot]
+        for column, index in self.indexes.items():
+            key = index_key(self.value(slot, column), rowid)
+            if sign > 0:
+                insort(index, key)
+            else:
+                del index[bisect_left(index, key)]
+        key = (self.dates[slot][:7], self.type_names[self.types[slot]])
+        totals = self.monthly.setdefault(key, [0, 0])
+        if not math.isnan(self.prices[slot]):
+            # NULL prices are counted but not summed like by SUM()
+            totals[0] += sign * self.prices[slot]
+        totals[1] += sign
+        if totals[1] == 0:
+            del self.monthly[key]
+
+    def compact(self):
+        """remove the deleted slots
+
+        """
+
+        keep = [slot for slot in range(len(self.rowids)) if self.alive[slot]]
+        self.rowids = array('q', (self.rowids[slot] for slot in keep))
+        self.dates = [self.dates[slot] for slot in keep]
+        self.names = [self.names[slot] for slot in keep]
+        self.prices = array('d', (self.prices[slot] for slot in keep))
+        self.types = array('H', (self.types[slot] for slot in keep))
+        self.alive = bytearray(b'\x01' * len(keep))
+
+    def drop_indexes(self):
+        """drop the sorted indexes before many writes, they are rebuilt on first use
+
+        Keeping a sorted list up to date costs O(n) per write, rebuilding
+        it once costs O(n log n).
+        """
+
+        self.indexes = {}
+
+    def index(self, column):
+        """sorted index_key() list of a column, built on first use
+
+        Parameters
+        ----------
+        column : str
+            name of the column, not 'rowid'
+        """
+
+        if column not in self.indexes:
+            self.indexes[column] = sorted(index_key(self.value(slot, column), self.rowids[slot])
+                    for slot in range(len(self.rowids)) if self.alive[slot])
+        return self.indexes[column]
+
+    def matcher(self, filters):
+        """function to test if the record of a slot matches filters
+
+        Returns None if there is nothing to filter.
+
+        Parameters
+        ----------
+        filters : dictionary
+            optional filters, see backend.FILTER_NAMES
+
+        Raises
+        ------
+        ValueError
+            If a filter is unknown
+        """
+
+        filters = filters or {}
+        unknown = set(filters) - set(FILTER_NAMES)
+        if unknown:
+            raise ValueError('Unknown filter "{}"'.format(', '.join(sorted(unknown))))
+        tests = []
+        if filters.get('date_from') is not None:
+            date_from = str(filters['date_from'])
+            tests.append(lambda slot: self.dates[slot] >= date_from)
+        if filters.get('date_to') is not None:
+            date_to = str(filters['date_to'])
+            tests.append(lambda slot: self.dates[slot] <= date_to)
+        if filters.get('types') is not None:
+            codes = {self.type_codes[t] for t in filters['types'] if t in self.type_codes}
+            tests.append(lambda slot: self.types[slot] in codes)
+        if filters.get('price_min') is not None:
+            price_min = filters['price_min']
+            tests.append(lambda slot: self.prices[slot] >= price_min)
+        if filters.get('price_max') is not None:
+            price_max = filters['price_max']
+            tests.append(lambda slot: self.prices[slot] <= price_max)
+        if not tests:
+            return None
+        return lambda slot: all(test(slot) for test in tests)
+
+    def slots(self, order='rowid', descending=False, after=None, filters=None):
+        """slots of the records in sort order following a sort key
+
+        Parameters
+        ----------
+        order : str
+            column to sort by, one of SORT_COLUMNS
+        descending : bool
+            True to sort descending
+        after : tuple
+            sort key (rowid,) or (value, rowid) to start after, optional
+        filters : dictionary
+            optional filters, see matcher()
+
+        Raises
+        ------
+        ValueError
+            If the column can not be sorted
+        """
+
+        if order not in SORT_COLUMNS:
+            raise ValueError('Can\'t sort by "{}"'.format(order))
+        match = self.matcher(filters)
+        if order == 'rowid':
+            keys = self.rowids
+            after = None if after is None else after[0]
+        else:
+            keys = self.index(order)
+            after = None if after is None else index_key(*after)
+        if descending:
+            start = len(keys) - 1 if after is None else bisect_left(keys, after) - 1
+            positions = range(start, -1, -1)
+        else:
+            start = 0 if after is None else bisect_right(keys, after)
+            positions = range(start, len(keys))
+        for position in positions:
+            slot = position if order == 'rowid' else self.find(keys[position][2])
+            if self.alive[slot] and (match is None or match(slot)):
+                yield slot
+
+
+class MemoryBackend(StorageBackend):
+    """
+    MemoryBackend class used to keep the records in memory
+
+    An implementation of StorageBackend without any disk I/O, e.g. for
+    tests, benchmarks and scratch ledgers. Every table is a MemoryTable
+    with columnar arrays, sorted indexes for the sort columns and running
+    sums per month and type. Writes inside transaction() are rolled back
+    on an exception, the data is lost on close().
+
+    ...
+
+    Attributes
+    ----------
+    tables : dictionary
+        MemoryTable per table name
+    depth : int
+        number of open transaction contexts
+    undo : list
+        writes of the open transaction (table, action, slot, old record)
+
+    Methods
+    -------
+    transaction()
+        context manager to group many writes, rolled back on an exception
+    close()
+        drop all tables
+    see StorageBackend for the other methods
+    """
+
+    def __init__(self):
+        self.tables = {}
+        self.depth = 0
+        self.undo = []
+
+    @contextmanager
+    def transaction(self):
+        """context manager to group many writes, rolled back on an exception
+
+        Contexts can be nested, an exception rolls back all writes of the
+        outermost context.
+        """
+
+        self.depth += 1
+        try:
+            yield self
+        except BaseException:
+            self.depth -= 1
+            if self.depth == 0:
+                self.rollback()
+            raise
+        self.depth -= 1
+        if self.depth == 0:
+            self.undo = []
+            self.compact()
+
+    def rollback(self):
+        """helper-method to undo the writes of the open transaction
+
+        """
+
+        for table in {write[0] for write in self.undo}:
+            table.drop_indexes()
+        for table, action, slot, old in reversed(self.undo):
+            if action == 'insert':
+                # inserts append, so in reverse order the slot is the last one
+                table.drop_last()
+            elif action == 'delete':
+                table.revive(slot)
+            else:
+                table.set(slot, *old[1:])
+        self.undo = []
+
+    def log(self, table, action, slot, old=None):
+        """helper-method to remember a write for a rollback
+
+        Parameters
+        ----------
+        table : MemoryTable
+            changed table
+        action : str
+            'insert', 'delete' or 'update'
+        slot : int
+            changed slot
+        old : tuple
+            record before an update
+        """
+
+        if self.depth:
+            self.undo.append((table, action, slot, old))
+
+    def compact(self):
+        """helper-method to remove deleted slots outside of transactions
+
+        """
+
+        if self.depth:
+            return
+        for table in self.tables.values():
+            deleted = len(table.rowids) - table.live
+            if deleted > COMPACT_MIN and deleted > table.live:
+                table.compact()
+
+    def table(self, table_name):
+        """helper-method to get a table
+
+        Parameters
+        ----------
+        table_name : str
+            name of the table
+
+        Raises
+        ------
+        ValueError
+            If the table does not exist
+        """
+
+        try:
+            return self.tables[table_name]
+        except KeyError:
+            raise ValueError('No such table "{}"'.format(table_name)) from None
+
+    def close(self):
+        """drop all tables
+
+        """
+
+        self.tables = {}
+        self.undo = []
+
+    def migrate(self, table_name):
+        """create the table if it does not exist
+
+        Parameters
+        ----------
+        table_name : str
+            name of the table
+        """
+
+        self.tables.setdefault(table_name, MemoryTable())
+
+    def insert_one(self, date, name, price, quantity, table_name):
+        table = self.table(table_name)
+        self.log(table, 'insert', table.insert(date, name, price, quantity))
+
+    def insert_many(self, records, table_name, batch_size=1000):
+        table = self.table(table_name)
+        table.drop_indexes()
+        count = 0
+        with self.transaction():
+            for record in records:
+                self.log(table, 'insert', table.insert(*record))
+                count += 1
+        return count
+
+    def select_all(self, table_name):
+        table = self.table(table_name)
+        return [table.record(slot) for slot in table.slots()]
+
+    def iter_records(self, table_name, order='rowid', descending=False, filters=None,
+            batch_size=1000):
+        table = self.table(table_name)
+        for slot in table.slots(order, descending, None, filters):
+            yield table.record(slot)
+
+    def select_one(self, id, table_name):
+        table = self.table(table_name)
+        slot = table.find(id)
+        if slot is None or not table.alive[slot]:
+            return None
+        return table.record(slot)
+
+    def select_page(self, table_name, after=None, limit=100, order='rowid', descending=False,
+            filters=None):
+        table = self.table(table_name)
+        slots = table.slots(order, descending, after, filters)
+        return [table.record(slot) for slot in islice(slots, limit)]
+
+    def select_key_at(self, table_name, offset, order='rowid', descending=False, filters=None):
+        table = self.table(table_name)
+        if not filters and order != 'rowid' and offset < table.live:
+            # the index only holds stored records
+            index = table.index(order)
+            return index[-1 - offset if descending else offset][1:]
+        slot = next(islice(table.slots(order, descending, None, filters), offset, None), None)
+        if slot is None:
+            return None
+        if order == 'rowid':
+            return (table.rowids[slot],)
+        return (table.value(slot, order), table.rowids[slot])
+
+    def count(self, table_name, filters=None):
+        table = self.table(table_name)
+        match = table.matcher(filters)
+        if match is None:
+            return table.live
+        return sum(1 for slot in table.slots(filters=filters))
+
+    def search(self, table_name, text, limit=100, filters=None):
+        words = WORD.findall(fold(text))
+        if not words:
+            return []
+        table = self.table(table_name)
+
+        def found(slot):
+            tokens = WORD.findall(fold(table.names[slot] or ''))
+            return all(any(t.startswith(w) for t in tokens) for w in words)
+
+        slots = (slot for slot in table.slots('rowid', True, None, filters) if found(slot))
+        return [table.record(slot) for slot in islice(slots, limit)]
+
+    def select_monthly_totals(self, table_name, month_from=None, month_to=None, types=None):
+        table = self.table(table_name)
+        return [(month, type, total, count)
+                for (month, type), (total, count) in sorted(table.monthly.items())
+                if (month_from is None or month >= month_from)
+                and (month_to is None or month <= month_to)
+                and (types is None or type in types)]
+
+    def group(self, table, filters, key):
+        """helper-method to sum and count the prices of the records per key
+
+        Parameters
+        ----------
+        table : MemoryTable
+            table to aggregate
+        filters : dictionary
+            optional filters
+        key : function
+            key(slot) of the group of a slot
+        """
+
+        groups = {}
+        for slot in table.slots(filters=filters):
+            totals = groups.setdefault(key(slot), [0, 0])
+            if not math.isnan(table.prices[slot]):
+                totals[0] += table.prices[slot]
+            totals[1] += 1
+        return sorted((group, total, count) for group, (total, count) in groups.items())
+
+    def sum_monthly(self, table, filters, position):
+        """helper-method to group the monthly totals by month (0) or type (1)
+
+        Parameters
+        ----------
+        table : MemoryTable
+            table to aggregate
+        filters : dictionary
+            optional filter 'types'
+        position : int
+            0 to group by month, 1 to group by type
+        """
+
+        types = (filters or {}).get('types')
+        groups = {}
+        for key, (total, count) in table.monthly.items():
+            if types is None or key[1] in types:
+                totals = groups.setdefault(key[position], [0, 0])
+                totals[0] += total
+                totals[1] += count
+        return sorted((group, total, count) for group, (total, count) in groups.items())
+
+    def sum_by_type(self, table_name, filters=None):
+        table = self.table(table_name)
+        table.matcher(filters)
+        if self.use_monthly_totals(filters):
+            return self.sum_monthly(table, filters, 1)
+        return self.group(table, filters, lambda slot: table.type_names[table.types[slot]])
+
+    def sum_by_month(self, table_name, filters=None):
+        table = self.table(table_name)
+        table.matcher(filters)
+        if self.use_monthly_totals(filters):
+            return self.sum_monthly(table, filters, 0)
+        return self.group(table, filters, lambda slot: table.dates[slot][:7])
+
+    def sum_by_month_and_type(self, table_name, filters=None):
+        table = self.table(table_name)
+        table.matcher(filters)
+        if self.use_monthly_totals(filters):
+            return self.select_monthly_totals(table_name, types=(filters or {}).get('types'))
+        return [(month, type, total, count) for (month, type), total, count
+                in self.group(table, filters,
+                lambda slot: (table.dates[slot][:7], table.type_names[table.types[slot]]))]
+
+    def sum_by_sign(self, table_name, filters=None):
+        table = self.table(table_name)
+        return self.group(table, filters, lambda slot: -1 if table.prices[slot] < 0 else 1)
+
+    def sum_by_day(self, table_name, filters=None):
+        table = self.table(table_name)
+        return [(day, total) for day, total, count
+                in self.group(table, filters, lambda slot: table.dates[slot])]
+
+    def generation(self, table_name):
+        return self.table(table_name).generation
+
+    def delete_one(self, id, table_name):
+        table = self.table(table_name)
+        slot = table.find(id)
+        if slot is None or not table.alive[slot]:
+            raise mvc_exc.ItemNotStored(
+                'Can\'t delete "{}" because it\'s not stored in table "{}"'
+                .format(id, table_name))
+        table.remove(slot)
+        self.log(table, 'delete', slot)
+        self.compact()
+
+    def update_one(self, id, date, name, price, quantity, table_name):
+        table = self.table(table_name)
+        slot = table.find(id)
+        if slot is None or not table.alive[slot]:
+            raise mvc_exc.ItemNotStored(
+                'Can\'t update "{}" because it\'s not stored in table "{}"'
+                .format(name, table_name))
+        self.log(table, 'update', slot, table.record(slot))
+        table.set(slot, date, name, price, quantity)
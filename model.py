@@ -1,30 +1,600 @@
+import datetime
+import functools
+import math
+from array import array
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import profiling
 from sqlite_backend import DBConnection
 
+# price column value of a NULL price in TransactionColumns
+NAN = float('nan')
+# name of the database table of the transactions
+TABLE_NAME = 'myTransactions'
+
+# the first type is income, all others are expenditures
+TRANSACTION_TYPES = [
+    "Gehalt",
+    "Lebenshaltung",
+    "Mobilität",
+    "Sonstiges",
+    "Telekommunikation",
+    "Wohnen",
+]
+
+
+class TransactionAggregates(object):
+    """
+    TransactionAggregates class used to keep running totals of the ledger
+
+    The totals are updated from the deltas of single writes, so the
+    charts can be redrawn without rescanning all transactions.
+
+    ...
+
+    Attributes
+    ----------
+    totals : dictionary
+        sum of prices per type
+    counts : dictionary
+        number of transactions per type
+    income : float
+        sum of all positive prices
+    expenditure : float
+        sum of all negative prices
+    count : int
+        number of transactions
+
+    Methods
+    -------
+    load(by_type, by_sign)
+        rebuild all totals from grouped sums of the database
+    add(price, type)
+        add a transaction to the totals
+    remove(price, type)
+        remove a transaction from the totals
+    pie_data(transaction_types)
+        expenditures per type for the pie chart
+    bar_data()
+        ratio of expenditures and income for the bar chart
+    """
+
+    def __init__(self):
+        self.totals = {}
+        self.counts = {}
+        self.income = 0
+        self.expenditure = 0
+        self.count = 0
+
+    def load(self, by_type, by_sign):
+        """rebuild all totals from grouped sums of the database
+
+        The sum of a group of NULL prices is NULL and loaded as 0.
+
+        Parameters
+        ----------
+        by_type : list with tuples
+            sum and count per type (type, sum, count)
+        by_sign : list with tuples
+            sum and count per sign of price (sign, sum, count)
+        """
+
+        self.__init__()
+        for type, total, count in by_type:
+            self.totals[type] = total or 0
+            self.counts[type] = count
+            self.count += count
+        for sign, total, count in by_sign:
+            if sign < 0:
+                self.expenditure = total or 0
+            else:
+                self.income = total or 0
+
+    def add(self, price, type):
+        """add a transaction to the totals
+
+        A NULL price is counted but not summed, like SUM() of the database.
+
+        Parameters
+        ----------
+        price : float
+            price of the transaction, None for a NULL price
+        type : str
+            type of the transaction
+        """
+
+        self.counts[type] = self.counts.get(type, 0) + 1
+        self.count += 1
+        self.totals.setdefault(type, 0)
+        if price is None:
+            return
+        self.totals[type] += price
+        if price < 0:
+            self.expenditure += price
+        else:
+            self.income += price
+
+    def remove(self, price, type):
+        """remove a transaction from the totals
+
+        Parameters
+        ----------
+        price : float
+            price of the transaction, None for a NULL price
+        type : str
+            type of the transaction
+        """
+
+        self.counts[type] -= 1
+        if self.counts[type] == 0:
+            # drop the type to get rid of float rounding leftovers
+            del self.counts[type]
+            del self.totals[type]
+        elif price is not None:
+            self.totals[type] -= price
+        if price is not None and price < 0:
+            self.expenditure -= price
+        elif price is not None:
+            self.income -= price
+        self.count -= 1
+        if self.count == 0:
+            self.income = 0
+            self.expenditure = 0
+
+    def pie_data(self, transaction_types):
+        """expenditures per type for the pie chart
+
+        Parameters
+        ----------
+        transaction_types : list
+            types of transactions, the first one is income
+        """
+
+        mylist = []
+        for tt in transaction_types[1:]: # dismiss 'Gehalt' from list -> income not expenditure!
+            sum_counter = self.totals.get(tt, 0)
+            if sum_counter < 0:
+                mylist.append([tt, abs(sum_counter)])
+        return mylist
+
+    def bar_data(self):
+        """ratio of expenditures and income for the bar chart
+
+        """
+
+        sum_total = 1 + self.income + abs(self.expenditure)
+        return [
+            ['Ausgaben', abs(self.expenditure / sum_total)],
+            ['Einnahmen', self.income / sum_total],
+        ]
+
+
+def date_ordinal(date):
+    """ordinal of a date (yyyy-mm-dd), 0 if the date is invalid
+
+    Parameters
+    ----------
+    date : str
+        date of a transaction
+    """
+
+    try:
+        return datetime.date.fromisoformat(str(date)).toordinal()
+    except ValueError:
+        return 0
+
+
+class Transaction(object):
+    """
+    Transaction class used as record of a single transaction
+
+    ...
+
+    Attributes
+    ----------
+    rowid : int
+        ID
+    date : str
+        date (yyyy-mm-dd)
+    name : str
+        name of the transaction
+    price : float
+        price, negative for expenditures
+    type : str
+        type of the transaction
+
+    Methods
+    -------
+    from_record(record)
+        create a transaction from a record (rowid, idate, name, price, type)
+    ordinal()
+        date as ordinal, 0 if the date is invalid
+    """
+
+    __slots__ = ('rowid', 'date', 'name', 'price', 'type')
+
+    def __init__(self, rowid, date, name, price, type):
+        self.rowid = rowid
+        self.date = date
+        self.name = name
+        self.price = price
+        self.type = type
+
+    @classmethod
+    def from_record(cls, record):
+        """create a transaction from a record (rowid, idate, name, price, type)
+
+        Parameters
+        ----------
+        record : sequence
+            record of the database or values of a table row
+        """
+
+        return cls(*record[:5])
+
+    def ordinal(self):
+        """date as ordinal, 0 if the date is invalid
+
+        """
+
+        return date_ordinal(self.date)
+
+    def __repr__(self):
+        return 'Transaction({!r}, {!r}, {!r}, {!r}, {!r})'.format(
+                self.rowid, self.date, self.name, self.price, self.type)
+
+
+class TransactionColumns(object):
+    """
+    TransactionColumns class used to hold many transactions in columns
+
+    Every column is a contiguous array, dates are stored as ordinals and
+    types as small codes, so a row takes a fraction of the memory of a
+    tuple and aggregates loop over arrays instead of tuples.
+
+    ...
+
+    Attributes
+    ----------
+    rowids : array
+        ID of every transaction
+    ordinals : array
+        date ordinal of every transaction, 0 for invalid dates
+    prices : array
+        price of every transaction, NaN for a NULL price
+    codes : array
+        type code of every transaction, up to 65536 types like MemoryTable
+    names : list
+        name of every transaction, equal names are stored once
+    types : list
+        type of every type code
+
+    Methods
+    -------
+    from_items(items)
+        create the columns from records (rowid, idate, name, price, type)
+    append(record)
+        add a record (rowid, idate, name, price, type)
+    extend(records)
+        add many records
+    aggregates()
+        totals of all transactions
+    """
+
+    def __init__(self):
+        self.rowids = array('q')
+        self.ordinals = array('i')
+        self.prices = array('d')
+        self.codes = array('H')
+        self.names = []
+        self.types = []
+        self.type_codes = {}
+        self.name_cache = {}
+
+    @classmethod
+    def from_items(cls, items):
+        """create the columns from records (rowid, idate, name, price, type)
+
+        Parameters
+        ----------
+        items : iterable with tuples
+            records, e.g. SQLiteCRUD.iter_items()
+        """
+
+        columns = cls()
+        columns.extend(items)
+        return columns
+
+    def append(self, record):
+        """add a record (rowid, idate, name, price, type)
+
+        Parameters
+        ----------
+        record : sequence
+            record of the database
+        """
+
+        rowid, date, name, price, type = record
+        code = self.type_codes.get(type)
+        if code is None:
+            code = self.type_codes[type] = len(self.types)
+            self.types.append(type)
+        self.rowids.append(rowid)
+        self.ordinals.append(date_ordinal(date))
+        self.prices.append(NAN if price is None else price)
+        self.codes.append(code)
+        self.names.append(self.name_cache.setdefault(name, name))
+
+    def extend(self, records):
+        """add many records
+
+        Parameters
+        ----------
+        records : iterable with tuples
+            records of the database
+        """
+
+        for record in records:
+            self.append(record)
+
+    def __len__(self):
+        return len(self.rowids)
+
+    def __getitem__(self, index):
+        ordinal = self.ordinals[index]
+        date = datetime.date.fromordinal(ordinal).isoformat() if ordinal > 0 else ''
+        price = self.prices[index]
+        return Transaction(self.rowids[index], date, self.names[index], 
+                None if math.isnan(price) else price, self.types[self.codes[index]])
+
+    def aggregates(self):
+        """totals of all transactions
+
+        NULL prices are counted but not summed, like SUM() of the database.
+        """
+
+        totals = [0] * len(self.types)
+        counts = [0] * len(self.types)
+        income = 0
+        expenditure = 0
+        for price, code in zip(self.prices, self.codes):
+            counts[code] += 1
+            if price != price:
+                # NaN of a NULL price
+                continue
+            totals[code] += price
+            if price < 0:
+                expenditure += price
+            else:
+                income += price
+        aggregates = TransactionAggregates()
+        aggregates.load([(t, totals[c], counts[c]) for c, t in enumerate(self.types)],
+                [(-1, expenditure, 0), (1, income, 0)])
+        return aggregates
+
+
+def freeze(value):
+    """hashable copy of a value of query parameters
+
+    Dictionaries become sorted tuples of their items, lists and sets
+    become tuples.
+
+    Parameters
+    ----------
+    value : object
+        parameter of a query, e.g. filters
+    """
+
+    if isinstance(value, dict):
+        return tuple(sorted((k, freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return tuple(sorted(value))
+    return value
+
+
+class ReadCache(object):
+    """
+    ReadCache class used to keep the results of recent queries
+
+    Results are stored by the name and parameters of the query and evicted
+    in least recently used order. Every write bumps the generation, which
+    drops all results, so a result is only returned while the data is
+    unchanged. The results are shared, callers must not change them.
+
+    ...
+
+    Attributes
+    ----------
+    size : int
+        maximum number of results, 0 disables the cache
+    generation : int
+        number of writes since the cache was created
+    hits : int
+        number of queries answered from the cache
+    misses : int
+        number of queries sent to the storage
+
+    Methods
+    -------
+    get(key, load)
+        result of a query, loaded on a miss
+    invalidate()
+        bump the generation and drop all results
+    stats()
+        hits, misses and number of results
+    """
+
+    def __init__(self, size=128):
+        """
+        Parameters
+        ----------
+        size : int
+            maximum number of results, 0 disables the cache
+        """
+
+        self.size = size
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.results = OrderedDict()
+
+    def get(self, key, load):
+        """result of a query, loaded on a miss
+
+        Parameters
+        ----------
+        key : tuple
+            hashable name and parameters of the query
+        load : callable
+            function without arguments which runs the query
+        """
+
+        if key in self.results:
+            self.hits += 1
+            self.results.move_to_end(key)
+            return self.results[key]
+        self.misses += 1
+        generation = self.generation
+        result = load()
+        # a write while loading, e.g. of a nested call, makes the result stale
+        if self.size > 0 and generation == self.generation:
+            self.results[key] = result
+            if len(self.results) > self.size:
+                self.results.popitem(last=False)
+        return result
+
+    def invalidate(self):
+        """bump the generation and drop all results
+
+        """
+
+        self.generation += 1
+        self.results.clear()
+
+    def stats(self):
+        """hits, misses and number of results
+
+        """
+
+        return {"hits": self.hits, "misses": self.misses, "size": len(self.results),
+                "generation": self.generation}
+
+
+def cached(method):
+    """decorator to answer a read method of SQLiteCRUD from its cache
+
+    Parameters
+    ----------
+    method : function
+        read method, all arguments are part of the key
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = (method.__name__, freeze(args), freeze(kwargs))
+        return self.cache.get(key, lambda: method(self, *args, **kwargs))
+    return wrapper
+
 
 class SQLiteCRUD(object):
     """
     SQLiteCRUD class used as model to connect to database
 
+    The records are stored by a StorageBackend, by default the SQLite
+    database. Pages, searches and aggregates are answered from a ReadCache
+    until the next create, update or delete. Reads of all items are not
+    cached, they would keep a copy of the whole ledger in memory.
+
     ...
 
+    Attributes
+    ----------
+    aggregates : TransactionAggregates
+        running totals of the stored transactions
+    cache : ReadCache
+        results of recent reads
+
     Methods
     -------
     create_item(date, name, price, quality)
         to save a item in the database
+    create_items(items, batch_size=1000)
+        to save many items in the database at once
+    batch()
+        context manager to save many changes with one commit
+    close()
+        close the connection to the database
     read_items()
         read all items from database table
+    iter_items(filters=None, order='rowid', descending=False, batch_size=1000)
+        iterate over the items in bounded memory
+    read_columns(filters=None)
+        read the items into a TransactionColumns
+    read_page(after_rowid=None, limit=100, order='rowid', descending=False, after_value=None, filters=None)
+        read a page of items following an item
+    read_window(offset, limit, order='rowid', descending=False, filters=None)
+        read a page of items starting at a position
+    count_items(filters=None)
+        count all items in the database table
+    search_items(text, limit=100, filters=None)
+        search items by the words of their name
+    read_monthly_totals(month_from=None, month_to=None, types=None)
+        sum and count of items per month and type
+    read_totals_by_type(filters=None)
+        sum and count of items per type
+    read_totals_by_month(filters=None)
+        sum and count of items per month
+    read_totals_by_month_and_type(filters=None)
+        sum and count of items per month and type
+    read_totals_by_sign(filters=None)
+        sum and count of expenditures and income
+    read_totals_by_day(filters=None)
+        sum of items per date
+    read_balance(filters=None)
+        balance at the end of every day
+    read_spending(transaction_types, filters=None)
+        expenditures of every month
+    read_generation()
+        number of writes to the database table
     update_item(id, date, name, price, quantity)
         update a item in the database
     delete_item(id)
         delete a item in the database
     """
 
-    def __init__(self):
-        self.table_name = 'myTransactions'
-        self._connection = DBConnection('transactions')
-        self._connection.create_table(self.table_name)
+    def __init__(self, db_name='transactions', journal_mode=None, synchronous=None, backend=None,
+            cache_size=128):
+        """
+        Parameters
+        ----------
+        db_name : str
+            name of the database file without '.db'
+        journal_mode : str
+            journal mode of the database e.g. 'WAL', optional
+        synchronous : str
+            synchronous level e.g. 'NORMAL', optional
+        backend : StorageBackend
+            storage engine, e.g. MemoryBackend(), a DBConnection to the
+            database file if None
+        cache_size : int
+            maximum number of cached read results, 0 disables the cache
+        """
 
+        self.table_name = TABLE_NAME
+        self.cache = ReadCache(cache_size)
+        if backend is None:
+            backend = DBConnection(db_name, 
+                    journal_mode=journal_mode, synchronous=synchronous)
+        self._connection = backend
+        self._connection.migrate(self.table_name)
+        self.aggregates = TransactionAggregates()
+        self.aggregates.load(self.read_totals_by_type(), self.read_totals_by_sign())
 
+
+    @profiling.timed
     def create_item(self, date, name, price, quality):
         """to save a item in the database
 
@@ -40,9 +610,64 @@ class SQLiteCRUD(object):
             type of expenditure 
         """
         
+        self.cache.invalidate()
         self._connection.insert_one(
             date, name, price, quality, table_name=self.table_name)
+        self.aggregates.add(price, quality)
         
+    @profiling.timed
+    def create_items(self, items, batch_size=1000):
+        """to save many items in the database at once
+
+        All items are written in a single transaction.
+
+        Parameters
+        ----------
+        items : iterable with tuples
+            item details (date, name, price, type)
+        batch_size : int
+            number of items read from the iterable and inserted at once
+        """
+
+        def counted(items):
+            for item in items:
+                self.aggregates.add(item[2], item[3])
+                yield item
+
+        self.cache.invalidate()
+        with self.batch():
+            return self._connection.insert_many(
+                counted(items), table_name=self.table_name, batch_size=batch_size)
+
+    def close(self):
+        """close the connection to the database
+
+        """
+
+        self._connection.close()
+
+    @contextmanager
+    def batch(self):
+        """context manager to save many changes with one commit
+
+        All create, update and delete calls inside the context are written
+        in a single transaction, e.g.
+
+            with model.batch():
+                model.create_item(...)
+                model.delete_item(...)
+        """
+
+        try:
+            with self._connection.transaction():
+                yield self
+        except BaseException:
+            # the transaction was rolled back, rebuild the running totals
+            self.cache.invalidate()
+            self.aggregates.load(self.read_totals_by_type(), self.read_totals_by_sign())
+            raise
+
+    @profiling.timed
     def read_items(self):
         """read all items from database table
 
@@ -50,6 +675,294 @@ class SQLiteCRUD(object):
         return self._connection.select_all(
             table_name=self.table_name)
 
+    def iter_items(self, filters=None, order='rowid', descending=False, batch_size=1000):
+        """iterate over the items in bounded memory
+
+        The items are read in batches of batch_size, e.g. to export or
+        aggregate a ledger of any size. The generator has to be consumed
+        on the thread of the model. For pages of the table use read_page().
+
+        Parameters
+        ----------
+        filters : dictionary
+            optional filters 'date_from', 'date_to', 'types', 'price_min'
+            and 'price_max'
+        order : str
+            column to sort by ('rowid', 'idate', 'name', 'price' or 'type')
+        descending : bool
+            True to sort descending
+        batch_size : int
+            number of items read at once
+        """
+
+        return self._connection.iter_records(table_name=self.table_name, order=order, 
+                descending=descending, filters=filters, batch_size=batch_size)
+
+    @profiling.timed
+    def read_columns(self, filters=None):
+        """read the items into a TransactionColumns, e.g. for the analysis
+
+        Parameters
+        ----------
+        filters : dictionary
+            optional filters 'date_from', 'date_to', 'types', 'price_min'
+            and 'price_max'
+        """
+
+        return TransactionColumns.from_items(self.iter_items(filters))
+
+    @profiling.timed
+    @cached
+    def read_page(self, after_rowid=None, limit=100, order='rowid', descending=False,
+            after_value=None, filters=None):
+        """read a page of items following an item
+
+        Parameters
+        ----------
+        after_rowid : int
+            rowid of the last item of the previous page, None for the first page
+        limit : int
+            maximum number of items
+        order : str
+            column to sort by ('rowid', 'idate', 'name', 'price' or 'type')
+        descending : bool
+            True to sort descending
+        after_value : str or float
+            value of the order column of the last item of the previous page
+        filters : dictionary
+            optional filters 'date_from', 'date_to', 'types', 'price_min'
+            and 'price_max'
+        """
+
+        after = None
+        if after_rowid is not None:
+            after = (after_rowid,) if order == 'rowid' else (after_value, after_rowid)
+        return self._connection.select_page(table_name=self.table_name, after=after, 
+                limit=limit, order=order, descending=descending, filters=filters)
+
+    @profiling.timed
+    @cached
+    def read_window(self, offset, limit, order='rowid', descending=False, filters=None):
+        """read a page of items starting at a position
+
+        Parameters
+        ----------
+        offset : int
+            position of the first item, starting at 0
+        limit : int
+            maximum number of items
+        order : str
+            column to sort by ('rowid', 'idate', 'name', 'price' or 'type')
+        descending : bool
+            True to sort descending
+        filters : dictionary
+            optional filters 'date_from', 'date_to', 'types', 'price_min'
+            and 'price_max'
+        """
+
+        after = None
+        if offset > 0:
+            after = self._connection.select_key_at(table_name=self.table_name, 
+                    offset=offset - 1, order=order, descending=descending, filters=filters)
+            if after is None:
+                return []
+        return self._connection.select_page(table_name=self.table_name, after=after, 
+                limit=limit, order=order, descending=descending, filters=filters)
+
+    @profiling.timed
+    @cached
+    def count_items(self, filters=None):
+        """count all items in the database table
+
+        Parameters
+        ----------
+        filters : dictionary
+            optional filters 'date_from', 'date_to', 'types', 'price_min'
+            and 'price_max'
+        """
+
+        return self._connection.count(table_name=self.table_name, filters=filters)
+
+    @profiling.timed
+    @cached
+    def search_items(self, text, limit=100, filters=None):
+        """search items by the words of their name
+
+        Parameters
+        ----------
+        text : str
+            words to search for, matched as prefixes
+        limit : int
+            maximum number of items
+        filters : dictionary
+            optional filters 'date_from', 'date_to', 'types', 'price_min'
+            and 'price_max'
+        """
+
+        return self._connection.search(
+            table_name=self.table_name, text=text, limit=limit, filters=filters)
+
+    @profiling.timed
+    @cached
+    def read_monthly_totals(self, month_from=None, month_to=None, types=None):
+        """sum and count of items per month and type
+
+        Reads the monthly totals table instead of all items.
+
+        Parameters
+        ----------
+        month_from : str
+            first month to include (yyyy-mm), optional
+        month_to : str
+            last month to include (yyyy-mm), optional
+        types : list
+            types to include, optional
+        """
+
+        return self._connection.select_monthly_totals(table_name=self.table_name, 
+                month_from=month_from, month_to=month_to, types=types)
+
+    @profiling.timed
+    @cached
+    def read_totals_by_type(self, filters=None):
+        """sum and count of items per type
+
+        Parameters
+        ----------
+        filters : dictionary
+            optional filters 'date_from', 'date_to', 'types', 'price_min'
+            and 'price_max'
+        """
+
+        return self._connection.sum_by_type(
+            table_name=self.table_name, filters=filters)
+
+    @profiling.timed
+    @cached
+    def read_totals_by_month(self, filters=None):
+        """sum and count of items per month (yyyy-mm)
+
+        Parameters
+        ----------
+        filters : dictionary
+            optional filters 'date_from', 'date_to', 'types', 'price_min'
+            and 'price_max'
+        """
+
+        return self._connection.sum_by_month(
+            table_name=self.table_name, filters=filters)
+
+    @profiling.timed
+    @cached
+    def read_totals_by_month_and_type(self, filters=None):
+        """sum and count of items per month (yyyy-mm) and type as (month, type, sum, count)
+
+        Without filters other than the types the monthly totals table is
+        read, otherwise the items are grouped by the database.
+
+        Parameters
+        ----------
+        filters : dictionary
+            optional filters 'date_from', 'date_to', 'types', 'price_min'
+            and 'price_max'
+        """
+
+        return self._connection.sum_by_month_and_type(
+            table_name=self.table_name, filters=filters)
+
+    @profiling.timed
+    @cached
+    def read_totals_by_sign(self, filters=None):
+        """sum and count of expenditures (-1) and income (1)
+
+        Parameters
+        ----------
+        filters : dictionary
+            optional filters 'date_from', 'date_to', 'types', 'price_min'
+            and 'price_max'
+        """
+
+        return self._connection.sum_by_sign(
+            table_name=self.table_name, filters=filters)
+
+    @profiling.timed
+    @cached
+    def read_totals_by_day(self, filters=None):
+        """sum of items per date (yyyy-mm-dd), ordered by date
+
+        Parameters
+        ----------
+        filters : dictionary
+            optional filters 'date_from', 'date_to', 'types', 'price_min'
+            and 'price_max'
+        """
+
+        return self._connection.sum_by_day(
+            table_name=self.table_name, filters=filters)
+
+    @profiling.timed
+    @cached
+    def read_balance(self, filters=None):
+        """balance at the end of every day as (date ordinal, balance)
+
+        Parameters
+        ----------
+        filters : dictionary
+            optional filters 'date_from', 'date_to', 'types', 'price_min'
+            and 'price_max'
+        """
+
+        balance = 0
+        mylist = []
+        for idate, total in self.read_totals_by_day(filters):
+            try:
+                day = datetime.date.fromisoformat(idate).toordinal()
+            except (TypeError, ValueError):
+                continue
+            balance += total
+            mylist.append((day, balance))
+        return mylist
+
+    @profiling.timed
+    @cached
+    def read_spending(self, transaction_types, filters=None):
+        """expenditures of every month as (year * 12 + month - 1, amount)
+
+        Months without expenditures are included with 0.
+
+        Parameters
+        ----------
+        transaction_types : list
+            valid types, the first one is income
+        filters : dictionary
+            optional filters 'date_from', 'date_to', 'types', 'price_min'
+            and 'price_max'
+        """
+
+        filters = filters or {}
+        types = filters.get("types") or transaction_types
+        types = [t for t in types if t != transaction_types[0]]
+        if not types:
+            return []
+        months = {}
+        for month, total, count in self.read_totals_by_month(dict(filters, types=types)):
+            try:
+                year, number = month.split("-")
+                months[int(year) * 12 + int(number) - 1] = -total
+            except (AttributeError, ValueError):
+                continue
+        if not months:
+            return []
+        return [(m, months.get(m, 0)) for m in range(min(months), max(months) + 1)]
+
+    def read_generation(self):
+        """number of writes to the database table
+
+        """
+
+        return self._connection.generation(table_name=self.table_name)
+
+    @profiling.timed
     def update_item(self, id, date, name, price, quantity):
         """update a item in the database
 
@@ -67,10 +980,15 @@ class SQLiteCRUD(object):
             type of expenditure 
         """
         
+        self.cache.invalidate()
+        old = self._connection.select_one(id, table_name=self.table_name)
         self._connection.update_one(
             id, date, name, price, quantity, table_name=self.table_name)
+        self.aggregates.remove(old[3], old[4])
+        self.aggregates.add(price, quantity)
 
 
+    @profiling.timed
     def delete_item(self, id):
         """delete a item in the database
 
@@ -80,6 +998,9 @@ class SQLiteCRUD(object):
             ID
         """
 
+        self.cache.invalidate()
+        old = self._connection.select_one(id, table_name=self.table_name)
         self._connection.delete_one(
             id, table_name=self.table_name)
+        self.aggregates.remove(old[3], old[4])
 
@@ -0,0 +1,155 @@
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+# spans are only recorded after enable(), otherwise the timers are no-ops
+_enabled = False
+_started = None
+_spans = []
+_phases = {}
+_lock = threading.Lock()
+
+
+def enable():
+    """start recording timing spans
+
+    The time of the call is the start of all phases.
+    """
+
+    global _enabled, _started
+    with _lock:
+        _enabled = True
+        _started = time.perf_counter()
+        del _spans[:]
+        _phases.clear()
+
+
+def enabled():
+    """True if timing spans are recorded
+
+    """
+
+    return _enabled
+
+
+def record(name, start, seconds):
+    """store a finished span
+
+    Parameters
+    ----------
+    name : str
+        name of the span, e.g. "DBConnection.select_page"
+    start : float
+        time.perf_counter() at the start of the span
+    seconds : float
+        duration of the span
+    """
+
+    with _lock:
+        _spans.append((name, start - _started, seconds, threading.current_thread().name))
+
+
+@contextmanager
+def span(name):
+    """time the code of the with block
+
+    Parameters
+    ----------
+    name : str
+        name of the span
+    """
+
+    if not _enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, start, time.perf_counter() - start)
+
+
+def timed(function=None, name=None):
+    """decorator to time every call of a function
+
+    The span is named after the qualified name of the function, e.g.
+    "SQLiteCRUD.read_page", unless a name is given.
+
+    Parameters
+    ----------
+    function : callable
+        function to time
+    name : str
+        name of the span
+    """
+
+    if function is None:
+        return lambda function: timed(function, name)
+    name = name or function.__qualname__
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        if not _enabled:
+            return function(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            record(name, start, time.perf_counter() - start)
+    return wrapper
+
+
+def mark(phase):
+    """store the time since enable() for a phase like "startup"
+
+    Only the first mark of a phase is stored.
+
+    Parameters
+    ----------
+    phase : str
+        name of the phase
+    """
+
+    if not _enabled:
+        return
+    with _lock:
+        _phases.setdefault(phase, time.perf_counter() - _started)
+
+
+def summary():
+    """number, total, mean and maximum duration of the spans by name
+
+    """
+
+    with _lock:
+        spans = list(_spans)
+    result = {}
+    for name, start, seconds, thread in spans:
+        entry = result.setdefault(name, {"count": 0, "total": 0.0, "max": 0.0})
+        entry["count"] += 1
+        entry["total"] += seconds
+        entry["max"] = max(entry["max"], seconds)
+    for entry in result.values():
+        entry["mean"] = entry["total"] / entry["count"]
+    return result
+
+
+def write(path):
+    """write phases, summary and all spans to a JSON file
+
+    Times are in seconds, the start of a span is relative to enable().
+
+    Parameters
+    ----------
+    path : str
+        path of the JSON file
+    """
+
+    with _lock:
+        phases = dict(_phases)
+        spans = [{"name": name, "start": start, "seconds": seconds, "thread": thread}
+                for name, start, seconds, thread in _spans]
+    with open(path, "w") as f:
+        json.dump({"phases": phases, "summary": summary(), "spans": spans}, f, indent=1)
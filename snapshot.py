@@ -0,0 +1,269 @@
+import datetime
+import json
+import math
+import mmap
+import os
+import sqlite3
+import struct
+from array import array
+from bisect import bisect_left, bisect_right
+
+from model import TransactionColumns
+
+MAGIC = b'FINSNAP2'
+# magic, generation, number of rows, length of the types and charts JSON
+HEADER = struct.Struct('<8sqqII')
+
+
+class Snapshot(object):
+    """
+    Snapshot class used to show the ledger before the database is ready
+
+    A snapshot is a binary file with the records in columns: rowid, price
+    (float64, NaN for NULL), offset of the name (int64), date ordinal (int32)
+    and type code (uint16), followed by the UTF-8 names. The header holds the
+    generation of the table when it was written, the number of rows, the
+    types and the data of the charts as JSON. The file is memory-mapped,
+    so opening it does not read the records.
+
+    ...
+
+    Attributes
+    ----------
+    generation : int
+        generation of the table when the snapshot was written
+    count : int
+        number of records
+    types : list
+        type of every type code
+    charts : dictionary
+        data of the charts without filters
+
+    Methods
+    -------
+    open(path, db_path, table_name)
+        open a snapshot if it matches the database, None otherwise
+    record(position)
+        record (rowid, idate, name, price, type) at a position
+    read_window(offset, limit, order='rowid', descending=False, filters=None)
+        read records starting at a position
+    read_page(after_rowid=None, limit=100, order='rowid', descending=False, after_value=None, filters=None)
+        read the records following a record
+    close()
+        unmap the file
+    """
+
+    def __init__(self, path):
+        """
+        Parameters
+        ----------
+        path : str
+            path of the snapshot file
+
+        Raises
+        ------
+        ValueError
+            If the file is not a snapshot
+        """
+
+        with open(path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, self.generation, self.count, types_size, charts_size = \
+                    HEADER.unpack_from(self.map)
+            if magic != MAGIC:
+                raise ValueError('"{}" is not a snapshot'.format(path))
+            position = HEADER.size
+            self.types = json.loads(self.map[position:position + types_size])
+            position += types_size
+            self.charts = json.loads(self.map[position:position + charts_size])
+            position += charts_size
+            view = self.view = memoryview(self.map)
+            columns = []
+            for code, size, count in (('q', 8, self.count), ('d', 8, self.count),
+                    ('q', 8, self.count + 1), ('i', 4, self.count), ('H', 2, self.count)):
+                # the columns are aligned to their item size
+                position += -position % size
+                columns.append(view[position:position + size * count].cast(code))
+                position += size * count
+            self.rowids, self.prices, self.offsets, self.ordinals, self.codes = columns
+            self.names = view[position:]
+        except BaseException:
+            self.close()
+            raise
+
+    @classmethod
+    def open(cls, path, db_path, table_name):
+        """open a snapshot if it matches the database, None otherwise
+
+        The generation and the number of rows of the snapshot are compared
+        with the database, which is opened read-only for the check.
+
+        Parameters
+        ----------
+        path : str
+            path of the snapshot file
+        db_path : str
+            path of the database file
+        table_name : str
+            name of the database table
+        """
+
+        if not os.path.exists(path) or not os.path.exists(db_path):
+            return None
+        try:
+            snapshot = cls(path)
+        except (OSError, ValueError, struct.error, TypeError):
+            return None
+        try:
+            conn = sqlite3.connect('file:{}?mode=ro'.format(db_path), uri=True)
+            try:
+                generation = conn.execute("SELECT value FROM {}_meta WHERE key = 'generation'"
+                        .format(table_name)).fetchone()
+                count = conn.execute("SELECT COUNT(*) FROM {}".format(table_name)).fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            generation = count = None
+        if generation is None or (generation[0], count[0]) != (snapshot.generation, snapshot.count):
+            snapshot.close()
+            return None
+        return snapshot
+
+    def record(self, position):
+        """record (rowid, idate, name, price, type) at a position
+
+        Parameters
+        ----------
+        position : int
+            position of the record, in rowid order
+        """
+
+        ordinal = self.ordinals[position]
+        date = datetime.date.fromordinal(ordinal).isoformat() if ordinal > 0 else ''
+        name = bytes(self.names[self.offsets[position]:self.offsets[position + 1]]).decode()
+        price = self.prices[position]
+        return (self.rowids[position], date, name, None if math.isnan(price) else price,
+                self.types[self.codes[position]])
+
+    def records(self, start, limit, descending):
+        """helper-method to read records from a position in sort order
+
+        Parameters
+        ----------
+        start : int
+            position of the first record in sort order
+        limit : int
+            maximum number of records
+        descending : bool
+            True to read in descending rowid order
+        """
+
+        if descending:
+            positions = range(self.count - 1 - start, max(-1, self.count - 1 - start - limit), -1)
+        else:
+            positions = range(start, min(self.count, start + limit))
+        return [self.record(p) for p in positions]
+
+    def read_window(self, offset, limit, order='rowid', descending=False, filters=None):
+        """read records starting at a position
+
+        Only the rowid order without filters can be read, None otherwise.
+
+        Parameters
+        ----------
+        offset : int
+            position of the first record, starting at 0
+        limit : int
+            maximum number of records
+        order : str
+            column to sort by
+        descending : bool
+            True to sort descending
+        filters : dictionary
+            optional filters
+        """
+
+        if order != 'rowid' or filters:
+            return None
+        return self.records(max(0, offset), limit, descending)
+
+    def read_page(self, after_rowid=None, limit=100, order='rowid', descending=False,
+            after_value=None, filters=None):
+        """read the records following a record
+
+        Only the rowid order without filters can be read, None otherwise.
+
+        Parameters
+        ----------
+        after_rowid : int
+            rowid of the last record of the previous page, None for the first page
+        limit : int
+            maximum number of records
+        order : str
+            column to sort by
+        descending : bool
+            True to sort descending
+        after_value : str or float
+            value of the order column, not used for the rowid order
+        filters : dictionary
+            optional filters
+        """
+
+        if order != 'rowid' or filters:
+            return None
+        if after_rowid is None:
+            return self.records(0, limit, descending)
+        if descending:
+            start = self.count - bisect_left(self.rowids, after_rowid)
+        else:
+            start = bisect_right(self.rowids, after_rowid)
+        return self.records(start, limit, descending)
+
+    def close(self):
+        """unmap the file
+
+        """
+
+        for name in ('rowids', 'prices', 'offsets', 'ordinals', 'codes', 'names', 'view'):
+            view = self.__dict__.pop(name, None)
+            if view is not None:
+                view.release()
+        self.map.close()
+
+
+def write(path, model, charts):
+    """write a snapshot of all items of the model
+
+    The file is written next to the path and renamed, so a reader never
+    sees a partly written snapshot.
+
+    Parameters
+    ----------
+    path : str
+        path of the snapshot file
+    model : instance of Model-class
+        model with the items, e.g. SQLiteCRUD
+    charts : dictionary
+        data of the charts without filters
+    """
+
+    generation = model.read_generation()
+    columns = TransactionColumns.from_items(model.iter_items())
+    offsets = array('q', [0])
+    names = bytearray()
+    for name in columns.names:
+        names += (name or '').encode()
+        offsets.append(len(names))
+    header_types = json.dumps(columns.types).encode()
+    header_charts = json.dumps(charts).encode()
+    temporary = path + '.tmp'
+    with open(temporary, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, generation, len(columns), len(header_types), len(header_charts)))
+        f.write(header_types)
+        f.write(header_charts)
+        for column in (columns.rowids, columns.prices, offsets, columns.ordinals, columns.codes):
+            f.write(b'\0' * (-f.tell() % column.itemsize))
+            f.write(column.tobytes())
+        f.write(names)
+    os.replace(temporary, path)
@@ -1,14 +1,166 @@
 import sqlite3
+from contextlib import contextmanager
+from itertools import islice
 from sqlite3 import OperationalError, IntegrityError
 import mvc_exceptions as mvc_exc
+import profiling
+from backend import SORT_COLUMNS, StorageBackend
 
 DB_NAME = 'myDB'
+JOURNAL_MODES = ('DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF')
+SYNCHRONOUS_LEVELS = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
 
+# filters of the records (backend.FILTER_NAMES) with their condition, 'types' is compiled to IN (...)
+FILTERS = {
+    'date_from': 'idate >= ?',
+    'date_to': 'idate <= ?',
+    'types': None,
+    'price_min': 'price >= ?',
+    'price_max': 'price <= ?',
+}
 
-class DBConnection:
+# schema migrations, the position in the list is the schema version (PRAGMA user_version)
+MIGRATIONS = [
+    # 1: transactions table
+    [
+        'CREATE TABLE IF NOT EXISTS {table}( \
+            rowid INTEGER PRIMARY KEY AUTOINCREMENT, \
+            idate TEXT, \
+            name TEXT, \
+            price REAL, \
+            type TEXT)',
+    ],
+    # 2: indexes for date ranges and sums per type
+    [
+        'CREATE INDEX IF NOT EXISTS {table}_idate ON {table}(idate)',
+        'CREATE INDEX IF NOT EXISTS {table}_type ON {table}(type)',
+        'CREATE INDEX IF NOT EXISTS {table}_type_idate ON {table}(type, idate)',
+    ],
+    # 3: indexes for sorting by name and price
+    [
+        'CREATE INDEX IF NOT EXISTS {table}_name ON {table}(name)',
+        'CREATE INDEX IF NOT EXISTS {table}_price ON {table}(price)',
+    ],
+    # 4: full-text index of the names, kept in sync by triggers
+    [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS {table}_fts USING fts5( \
+            name, content='{table}', content_rowid='rowid')",
+        "CREATE TRIGGER IF NOT EXISTS {table}_fts_insert AFTER INSERT ON {table} BEGIN \
+            INSERT INTO {table}_fts(rowid, name) VALUES (new.rowid, new.name); \
+        END",
+        "CREATE TRIGGER IF NOT EXISTS {table}_fts_delete AFTER DELETE ON {table} BEGIN \
+            INSERT INTO {table}_fts({table}_fts, rowid, name) VALUES ('delete', old.rowid, old.name); \
+        END",
+        "CREATE TRIGGER IF NOT EXISTS {table}_fts_update AFTER UPDATE OF name ON {table} BEGIN \
+            INSERT INTO {table}_fts({table}_fts, rowid, name) VALUES ('delete', old.rowid, old.name); \
+            INSERT INTO {table}_fts(rowid, name) VALUES (new.rowid, new.name); \
+        END",
+        "INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')",
+    ],
+    # 5: sums per month and type, kept exact by triggers
+    [
+        'CREATE TABLE IF NOT EXISTS {table}_monthly_totals( \
+            month TEXT, \
+            type TEXT, \
+            sum REAL, \
+            count INTEGER, \
+            PRIMARY KEY (month, type))',
+        'INSERT INTO {table}_monthly_totals (month, type, sum, count) \
+            SELECT substr(idate, 1, 7), type, SUM(price), COUNT(*) FROM {table} \
+            GROUP BY 1, 2',
+        'CREATE TRIGGER IF NOT EXISTS {table}_monthly_insert AFTER INSERT ON {table} BEGIN \
+            INSERT INTO {table}_monthly_totals (month, type, sum, count) \
+                VALUES (substr(new.idate, 1, 7), new.type, new.price, 1) \
+                ON CONFLICT (month, type) DO UPDATE SET sum = sum + excluded.sum, count = count + 1; \
+        END',
+        'CREATE TRIGGER IF NOT EXISTS {table}_monthly_delete AFTER DELETE ON {table} BEGIN \
+            UPDATE {table}_monthly_totals SET sum = sum - old.price, count = count - 1 \
+                WHERE month = substr(old.idate, 1, 7) AND type = old.type; \
+            DELETE FROM {table}_monthly_totals \
+                WHERE month = substr(old.idate, 1, 7) AND type = old.type AND count = 0; \
+        END',
+        'CREATE TRIGGER IF NOT EXISTS {table}_monthly_update AFTER UPDATE OF idate, price, type ON {table} BEGIN \
+            UPDATE {table}_monthly_totals SET sum = sum - old.price, count = count - 1 \
+                WHERE month = substr(old.idate, 1, 7) AND type = old.type; \
+            DELETE FROM {table}_monthly_totals \
+                WHERE month = substr(old.idate, 1, 7) AND type = old.type AND count = 0; \
+            INSERT INTO {table}_monthly_totals (month, type, sum, count) \
+                VALUES (substr(new.idate, 1, 7), new.type, new.price, 1) \
+                ON CONFLICT (month, type) DO UPDATE SET sum = sum + excluded.sum, count = count + 1; \
+        END',
+    ],
+    # 6: generation counter, changed by every write to validate snapshots
+    [
+        'CREATE TABLE IF NOT EXISTS {table}_meta( \
+            key TEXT PRIMARY KEY, \
+            value INTEGER)',
+        "INSERT OR IGNORE INTO {table}_meta (key, value) VALUES ('generation', 0)",
+        "CREATE TRIGGER IF NOT EXISTS {table}_generation_insert AFTER INSERT ON {table} BEGIN \
+            UPDATE {table}_meta SET value = value + 1 WHERE key = 'generation'; \
+        END",
+        "CREATE TRIGGER IF NOT EXISTS {table}_generation_delete AFTER DELETE ON {table} BEGIN \
+            UPDATE {table}_meta SET value = value + 1 WHERE key = 'generation'; \
+        END",
+        "CREATE TRIGGER IF NOT EXISTS {table}_generation_update AFTER UPDATE ON {table} BEGIN \
+            UPDATE {table}_meta SET value = value + 1 WHERE key = 'generation'; \
+        END",
+    ],
+    # 7: NULL prices are counted but not summed in the monthly totals, sum + NULL was NULL
+    [
+        'DROP TRIGGER IF EXISTS {table}_monthly_insert',
+        'DROP TRIGGER IF EXISTS {table}_monthly_delete',
+        'DROP TRIGGER IF EXISTS {table}_monthly_update',
+        'DELETE FROM {table}_monthly_totals',
+        'INSERT INTO {table}_monthly_totals (month, type, sum, count) \
+            SELECT substr(idate, 1, 7), type, TOTAL(price), COUNT(*) FROM {table} \
+            GROUP BY 1, 2',
+        'CREATE TRIGGER {table}_monthly_insert AFTER INSERT ON {table} BEGIN \
+            INSERT INTO {table}_monthly_totals (month, type, sum, count) \
+                VALUES (substr(new.idate, 1, 7), new.type, IFNULL(new.price, 0), 1) \
+                ON CONFLICT (month, type) DO UPDATE SET sum = sum + excluded.sum, count = count + 1; \
+        END',
+        'CREATE TRIGGER {table}_monthly_delete AFTER DELETE ON {table} BEGIN \
+            UPDATE {table}_monthly_totals SET sum = sum - IFNULL(old.price, 0), count = count - 1 \
+                WHERE month = substr(old.idate, 1, 7) AND type = old.type; \
+            DELETE FROM {table}_monthly_totals \
+                WHERE month = substr(old.idate, 1, 7) AND type = old.type AND count = 0; \
+        END',
+        'CREATE TRIGGER {table}_monthly_update AFTER UPDATE OF idate, price, type ON {table} BEGIN \
+            UPDATE {table}_monthly_totals SET sum = sum - IFNULL(old.price, 0), count = count - 1 \
+                WHERE month = substr(old.idate, 1, 7) AND type = old.type; \
+            DELETE FROM {table}_monthly_totals \
+                WHERE month = substr(old.idate, 1, 7) AND type = old.type AND count = 0; \
+            INSERT INTO {table}_monthly_totals (month, type, sum, count) \
+                VALUES (substr(new.idate, 1, 7), new.type, IFNULL(new.price, 0), 1) \
+                ON CONFLICT (month, type) DO UPDATE SET sum = sum + excluded.sum, count = count + 1; \
+        END',
+    ],
+]
+
+# per-row insert triggers which insert_many replaces by a set-based statement
+# for all rows after a rowid, the triggers of missing modules are skipped
+BULK_TRIGGERS = {
+    '{table}_fts_insert':
+        'INSERT INTO {table}_fts(rowid, name) SELECT rowid, name FROM {table} WHERE rowid > ?',
+    '{table}_monthly_insert':
+        'INSERT INTO {table}_monthly_totals (month, type, sum, count) \
+            SELECT substr(idate, 1, 7), type, TOTAL(price), COUNT(*) FROM {table} \
+            WHERE rowid > ? GROUP BY 1, 2 \
+            ON CONFLICT (month, type) DO UPDATE SET sum = sum + excluded.sum, \
+                count = count + excluded.count',
+    '{table}_generation_insert':
+        "UPDATE {table}_meta SET value = value + \
+            (SELECT COUNT(*) FROM {table} WHERE rowid > ?) WHERE key = 'generation'",
+}
+
+
+class DBConnection(StorageBackend):
     """
     DBConnection class used to handle database queries
 
+    The SQLite implementation of StorageBackend. Every instance opens its
+    own connection to the database file.
+
     ...
 
     Attributes
@@ -19,45 +171,90 @@ class DBConnection:
         database connection
     cursor : 
         database cursor
+    depth : int
+        number of open transaction contexts
 
     Methods
     -------
     connect()
         to connect to the database
-    create_table(table_name)
-        create table
+    close()
+        close connection
+    transaction()
+        context manager to group many writes into one commit
+    commit()
+        commit the changes unless a transaction context is open
+    migrate(table_name)
+        create or upgrade the schema to the latest version
     insert_one(date, name, price, quantity, table_name)
         insert a record in the database
+    insert_many(records, table_name, batch_size=1000)
+        insert many records in a single transaction
     select_all(table_name)
         select all records in the database
+    iter_records(table_name, order='rowid', descending=False, filters=None, batch_size=1000)
+        iterate over the records in batches
+    select_one(id, table_name)
+        select a single record in the database
+    select_page(table_name, after=None, limit=100, order='rowid', descending=False, filters=None)
+        select a page of records following a sort key
+    select_key_at(table_name, offset, order='rowid', descending=False, filters=None)
+        select the sort key at a position of the table
+    count(table_name, filters=None)
+        count the records in the database
+    where(filters=None, conditions=())
+        compile filters to a parameterized WHERE clause
+    search(table_name, text, limit=100, filters=None)
+        search records by the words of their name
+    select_monthly_totals(table_name, month_from=None, month_to=None, types=None)
+        select the sums per month and type
+    sum_by_type(table_name, filters=None)
+        sum and count of records grouped by type
+    sum_by_month(table_name, filters=None)
+        sum and count of records grouped by month
+    sum_by_month_and_type(table_name, filters=None)
+        sum and count of records grouped by month and type
+    sum_by_sign(table_name, filters=None)
+        sum and count of records grouped by sign of price
+    sum_by_day(table_name, filters=None)
+        sum of records grouped by date
+    generation(table_name)
+        number of writes to the table
     delete_one(id, table_name)
         delete a record in the database
     update_one(id, date, name, price, quantity, table_name)
         update a record in the database
     """
     
-    instance = None
-
-    def __new__(cls, *args, **kwargs):
-        """singleton class to deal with database
-
-        """
-        if cls.instance is None:
-            cls.instance = super().__new__(DBConnection)
-            return cls.instance
-        return cls.instance
-
-    def __init__(self, db_name=DB_NAME):
+    def __init__(self, db_name=DB_NAME, journal_mode=None, synchronous=None):
         """
         Parameters
         ----------
         db_name : str 
             name of database 
+        journal_mode : str
+            journal mode of the database e.g. 'WAL', optional
+        synchronous : str
+            synchronous level e.g. 'NORMAL', optional
+
+        Raises
+        ------
+        ValueError
+            If the journal mode or synchronous level is unknown
         """
 
         self.name = '{}.db'.format(db_name)
         self.conn = self.connect()
         self.cursor = self.conn.cursor()
+        self.depth = 0
+        if journal_mode is not None:
+            if journal_mode.upper() not in JOURNAL_MODES:
+                raise ValueError('Unknown journal mode "{}"'.format(journal_mode))
+            self.conn.execute('PRAGMA journal_mode={}'.format(journal_mode))
+        if synchronous is not None:
+            if synchronous.upper() not in SYNCHRONOUS_LEVELS:
+                raise ValueError('Unknown synchronous level "{}"'.format(synchronous))
+            self.conn.execute('PRAGMA synchronous={}'.format(synchronous))
 
     def connect(self):
         """to connect to the database
@@ -68,38 +265,84 @@ class DBConnection:
         except sqlite3.Error as e:
             pass
 
+    @contextmanager
+    def transaction(self):
+        """context manager to group many writes into one commit
+
+        Contexts can be nested, the outermost one commits. On an exception
+        all writes of the outermost context are rolled back.
+
+        """
+        self.depth += 1
+        try:
+            yield self
+        except BaseException:
+            self.depth -= 1
+            if self.depth == 0:
+                self.conn.rollback()
+            raise
+        self.depth -= 1
+        if self.depth == 0:
+            self.conn.commit()
+
+    def commit(self):
+        """commit the changes unless a transaction context is open
+
+        """
+        if self.depth == 0:
+            self.conn.commit()
+
     def __del__(self):
         """close connection
 
         """
 
-        self.cursor.close()
-        self.conn.close()
+        self.close()
 
-    def create_table(self, table_name):
-        """create table
+    def close(self):
+        """close connection
+
+        """
+
+        if self.conn is not None:
+            self.cursor.close()
+            self.conn.close()
+            self.conn = None
+
+    @profiling.timed
+    def migrate(self, table_name):
+        """create or upgrade the schema to the latest version
+
+        The schema version is stored in PRAGMA user_version. Every missing
+        migration of MIGRATIONS runs in its own transaction. A migration
+        which needs a missing SQLite module (e.g. fts5) is skipped.
 
         Parameters
         ----------
         table_name : str
             name of the database table
-            
-        Raises
-        ------
-        OperationalError
         """
 
-        sql = f'CREATE TABLE {table_name}( \
-            rowid INTEGER PRIMARY KEY AUTOINCREMENT, \
-            idate TEXT, \
-            name TEXT, \
-            price REAL, \
-            type TEXT);'
-        try:
-            self.cursor.execute(sql)
-        except OperationalError as e:
-            print(e)
+        version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+        for number, statements in enumerate(MIGRATIONS[version:], version + 1):
+            self.conn.execute('BEGIN')
+            try:
+                try:
+                    for sql in statements:
+                        self.conn.execute(sql.format(table=table_name))
+                except OperationalError as e:
+                    if 'no such module' not in str(e):
+                        raise
+                    print(e)
+                    self.conn.rollback()
+                    self.conn.execute('BEGIN')
+                self.conn.execute('PRAGMA user_version={}'.format(number))
+            except BaseException:
+                self.conn.rollback()
+                raise
+            self.conn.commit()
 
+    @profiling.timed
     def insert_one(self, date, name, price, quantity, table_name):
         """insert a record in the database
 
@@ -127,10 +370,62 @@ class DBConnection:
             .format(table_name)
         try:
             self.cursor.execute(sql, (date, name, price, quantity))
-            self.conn.commit()
+            self.commit()
         except IntegrityError as e:
             print(e)
 
+    @profiling.timed
+    def insert_many(self, records, table_name, batch_size=1000):
+        """insert many records in a single transaction
+
+        The records are consumed in batches, so any iterable can be
+        inserted without holding it in memory. The per-row insert triggers
+        of BULK_TRIGGERS are dropped for the insert and their tables are
+        updated once for all new records before the triggers are created
+        again, all in the same transaction.
+
+        Parameters
+        ----------
+        records : iterable with tuples
+            record details (date, name, price, type)
+        table_name : str
+            name of the database table
+        batch_size : int
+            number of records passed to executemany at once
+
+        Raises
+        ------
+        IntegrityError
+        """
+
+        sql = "INSERT INTO {} ('idate', 'name', 'price', 'type') VALUES (?, ?, ?, ?)"\
+            .format(table_name)
+        records = iter(records)
+        count = 0
+        with self.transaction():
+            if not self.conn.in_transaction:
+                # the triggers must be restored by a rollback
+                self.conn.execute('BEGIN')
+            last = self.conn.execute('SELECT MAX(rowid) FROM {}'.format(table_name)).fetchone()[0]
+            updates = {name.format(table=table_name): update 
+                    for name, update in BULK_TRIGGERS.items()}
+            triggers = self.conn.execute("SELECT name, sql FROM sqlite_master \
+                WHERE type = 'trigger' AND name IN ({})".format(', '.join('?' * len(updates))),
+                list(updates)).fetchall()
+            for name, trigger_sql in triggers:
+                self.conn.execute('DROP TRIGGER {}'.format(name))
+            while True:
+                batch = list(islice(records, batch_size))
+                if not batch:
+                    break
+                self.cursor.executemany(sql, batch)
+                count += len(batch)
+            for name, trigger_sql in triggers:
+                self.conn.execute(updates[name].format(table=table_name), (last or 0,))
+                self.conn.execute(trigger_sql)
+        return count
+
+    @profiling.timed
     def select_all(self, table_name):
         """select all records in the database
 
@@ -141,10 +436,413 @@ class DBConnection:
         """
         
         sql = "SELECT * FROM {}".format(table_name)
-        self.cursor = self.conn.execute(sql)
-        results = self.cursor.fetchall()
-        return results 
+        return self.conn.execute(sql).fetchall()
+
+    def iter_records(self, table_name, order='rowid', descending=False, filters=None,
+            batch_size=1000):
+        """iterate over the records, fetched in batches on an own cursor
+
+        Only batch_size records are held in memory at once. The cursor is
+        closed when the generator is exhausted or closed.
+
+        Parameters
+        ----------
+        table_name : str
+            name of the database table
+        order : str
+            column to sort by, one of SORT_COLUMNS
+        descending : bool
+            True to sort descending
+        filters : dictionary
+            optional filters, see where()
+        batch_size : int
+            number of records fetched at once
+        """
+
+        order_by = self.sort_key(order, descending)[1]
+        where, params = self.where(filters)
+        sql = "SELECT * FROM {} {} ORDER BY {}".format(table_name, where, order_by)
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute(sql, params)
+            while True:
+                records = cursor.fetchmany(batch_size)
+                if not records:
+                    break
+                yield from records
+        finally:
+            cursor.close()
+
+    @profiling.timed
+    def select_one(self, id, table_name):
+        """select a single record in the database
+
+        Parameters
+        ----------
+        id : int
+            ID
+        table_name : str
+            name of the database table
+        """
+
+        sql = "SELECT * FROM {} WHERE rowid=?".format(table_name)
+        return self.conn.execute(sql, (id,)).fetchone()
+
+    def sort_key(self, order, descending):
+        """helper-method to build the sort key of a page query
+
+        Every order is extended by the rowid, so the key is unique and can
+        be used for keyset pagination. An index on the column serves both
+        directions.
+
+        Parameters
+        ----------
+        order : str
+            column to sort by, one of SORT_COLUMNS
+        descending : bool
+            True to sort descending
+
+        Raises
+        ------
+        ValueError
+            If the column can not be sorted
+        """
+
+        if order not in SORT_COLUMNS:
+            raise ValueError('Can\'t sort by "{}"'.format(order))
+        key = 'rowid' if order == 'rowid' else '{}, rowid'.format(order)
+        direction = ' DESC' if descending else ''
+        order_by = ', '.join(c + direction for c in key.split(', '))
+        return '({})'.format(key), order_by
+
+    def after_keys(self, order, descending, after):
+        """helper-method to build the conditions of the records following a sort key
+
+        SQLite sorts NULL values first, so they come first ascending and
+        last descending. A comparison with NULL is NULL, so the records
+        with a NULL value are selected with IS NULL. Returns the conditions
+        with their parameters in sort order, every one can use the index of
+        the column.
+
+        Parameters
+        ----------
+        order : str
+            column to sort by, one of SORT_COLUMNS
+        descending : bool
+            True to sort descending
+        after : tuple
+            sort key (rowid,) or (value, rowid) to start after
+        """
+
+        compare = '<' if descending else '>'
+        if order == 'rowid':
+            return [('rowid {} ?'.format(compare), after[-1:])]
+        value, rowid = after
+        if value is None:
+            conditions = [('{} IS NULL AND rowid {} ?'.format(order, compare), (rowid,))]
+            if not descending:
+                conditions.append(('{} IS NOT NULL'.format(order), ()))
+            return conditions
+        conditions = [('({}, rowid) {} (?, ?)'.format(order, compare), (value, rowid))]
+        if descending:
+            conditions.append(('{} IS NULL'.format(order), ()))
+        return conditions
+
+    @profiling.timed
+    def select_page(self, table_name, after=None, limit=100, order='rowid', descending=False,
+            filters=None):
+        """select a page of records following a sort key (keyset pagination)
+
+        Parameters
+        ----------
+        table_name : str
+            name of the database table
+        after : tuple
+            sort key of the last record of the previous page, (rowid,) or
+            (value, rowid), None for the first page
+        limit : int
+            maximum number of records
+        order : str
+            column to sort by, one of SORT_COLUMNS
+        descending : bool
+            True to sort descending
+        filters : dictionary
+            optional filters, see where()
+        """
 
+        order_by = self.sort_key(order, descending)[1]
+        conditions = [None] if after is None else self.after_keys(order, descending, after)
+        records = []
+        for condition in conditions:
+            where, params = self.where(filters, [] if condition is None else [condition])
+            sql = "SELECT * FROM {} {} ORDER BY {} LIMIT ?".format(table_name, where, order_by)
+            records += self.conn.execute(sql, (*params, limit - len(records))).fetchall()
+            if len(records) >= limit:
+                break
+        return records
+
+    @profiling.timed
+    def select_key_at(self, table_name, offset, order='rowid', descending=False, filters=None):
+        """select the sort key at a position of the table
+
+        Only the rowid b-tree or the index of the column is walked, so
+        seeking a far position is cheap compared to an OFFSET on the full
+        records.
+
+        Parameters
+        ----------
+        table_name : str
+            name of the database table
+        offset : int
+            position of the record, starting at 0
+        order : str
+            column to sort by, one of SORT_COLUMNS
+        descending : bool
+            True to sort descending
+        filters : dictionary
+            optional filters, see where()
+        """
+
+        key, order_by = self.sort_key(order, descending)
+        where, params = self.where(filters)
+        sql = "SELECT {} FROM {} {} ORDER BY {} LIMIT 1 OFFSET ?"\
+            .format(key[1:-1], table_name, where, order_by)
+        return self.conn.execute(sql, (*params, offset)).fetchone()
+
+    @profiling.timed
+    def count(self, table_name, filters=None):
+        """count the records in the database
+
+        Parameters
+        ----------
+        table_name : str
+            name of the database table
+        filters : dictionary
+            optional filters, see where()
+        """
+
+        where, params = self.where(filters)
+        sql = "SELECT COUNT(*) FROM {} {}".format(table_name, where)
+        return self.conn.execute(sql, params).fetchone()[0]
+
+    def where(self, filters=None, conditions=()):
+        """helper-method to compile filters to a parameterized WHERE clause
+
+        Parameters
+        ----------
+        filters : dictionary
+            optional filters 'date_from' and 'date_to' (yyyy-mm-dd),
+            'types' (list of types), 'price_min' and 'price_max'
+        conditions : tuple
+            additional conditions with their parameters (sql, params)
+
+        Raises
+        ------
+        ValueError
+            If a filter is unknown
+        """
+
+        filters = filters or {}
+        unknown = set(filters) - set(FILTERS)
+        if unknown:
+            raise ValueError('Unknown filter "{}"'.format(', '.join(sorted(unknown))))
+        sql = []
+        params = []
+        for name, value in filters.items():
+            if value is None:
+                continue
+            if name == 'types':
+                sql.append('type IN ({})'.format(', '.join('?' * len(value))))
+                params.extend(value)
+            else:
+                sql.append(FILTERS[name])
+                params.append(str(value) if name.startswith('date') else value)
+        for condition, condition_params in conditions:
+            sql.append(condition)
+            params.extend(condition_params)
+        if not sql:
+            return "", params
+        return "WHERE " + " AND ".join(sql), params
+
+    @profiling.timed
+    def search(self, table_name, text, limit=100, filters=None):
+        """search records by the words of their name
+
+        Every word of the text is matched as a prefix against the full-text
+        index, newest records first. Without the fts5 module a LIKE search
+        is used instead.
+
+        Parameters
+        ----------
+        table_name : str
+            name of the database table
+        text : str
+            words to search for
+        limit : int
+            maximum number of records
+        filters : dictionary
+            optional filters, see where()
+        """
+
+        words = text.split()
+        if not words:
+            return []
+        fts_table = '{}_fts'.format(table_name)
+        sql_check = "SELECT EXISTS(SELECT 1 FROM sqlite_master WHERE name=?)"
+        if self.conn.execute(sql_check, (fts_table,)).fetchone()[0]:
+            query = ' '.join('"{}"*'.format(w.replace('"', '""')) for w in words)
+            where, params = self.where(filters, [('{} MATCH ?'.format(fts_table), [query])])
+            sql = "SELECT {0}.* FROM {1} JOIN {0} ON {0}.rowid = {1}.rowid {2} \
+                ORDER BY {1}.rowid DESC LIMIT ?".format(table_name, fts_table, where)
+        else:
+            # % and _ of the words are matched literally
+            conditions = [("name LIKE ? ESCAPE '\\'", ['%{}%'.format(w.replace('\\', '\\\\')
+                    .replace('%', '\\%').replace('_', '\\_'))]) for w in words]
+            where, params = self.where(filters, conditions)
+            sql = "SELECT * FROM {} {} ORDER BY rowid DESC LIMIT ?".format(table_name, where)
+        return self.conn.execute(sql, (*params, limit)).fetchall()
+
+    @profiling.timed
+    def select_monthly_totals(self, table_name, month_from=None, month_to=None, types=None):
+        """select the sums per month and type
+
+        The sums are read from the monthly totals table, which is kept up
+        to date by triggers.
+
+        Parameters
+        ----------
+        table_name : str
+            name of the database table
+        month_from : str
+            first month to include (yyyy-mm), optional
+        month_to : str
+            last month to include (yyyy-mm), optional
+        types : list
+            types to include, optional
+        """
+
+        conditions = []
+        if month_from is not None:
+            conditions.append(('month >= ?', [month_from]))
+        if month_to is not None:
+            conditions.append(('month <= ?', [month_to]))
+        where, params = self.where({'types': types}, conditions)
+        sql = "SELECT month, type, sum, count FROM {}_monthly_totals {} ORDER BY month, type"\
+            .format(table_name, where)
+        return self.conn.execute(sql, params).fetchall()
+
+    @profiling.timed
+    def sum_by_type(self, table_name, filters=None):
+        """sum and count of records grouped by type
+
+        Parameters
+        ----------
+        table_name : str
+            name of the database table
+        filters : dictionary
+            optional filters, see where()
+        """
+
+        where, params = self.where(filters)
+        if self.use_monthly_totals(filters):
+            sql = "SELECT type, SUM(sum), SUM(count) FROM {}_monthly_totals {} GROUP BY type"\
+                .format(table_name, where)
+        else:
+            sql = "SELECT type, SUM(price), COUNT(*) FROM {} {} GROUP BY type"\
+                .format(table_name, where)
+        return self.conn.execute(sql, params).fetchall()
+
+    @profiling.timed
+    def sum_by_month(self, table_name, filters=None):
+        """sum and count of records grouped by month (yyyy-mm)
+
+        Parameters
+        ----------
+        table_name : str
+            name of the database table
+        filters : dictionary
+            optional filters, see where()
+        """
+
+        where, params = self.where(filters)
+        if self.use_monthly_totals(filters):
+            sql = "SELECT month, SUM(sum), SUM(count) FROM {}_monthly_totals {} \
+                GROUP BY month ORDER BY month".format(table_name, where)
+        else:
+            sql = "SELECT substr(idate, 1, 7) AS month, SUM(price), COUNT(*) \
+                FROM {} {} GROUP BY month ORDER BY month".format(table_name, where)
+        return self.conn.execute(sql, params).fetchall()
+
+    @profiling.timed
+    def sum_by_month_and_type(self, table_name, filters=None):
+        """sum and count of records grouped by month (yyyy-mm) and type
+
+        Parameters
+        ----------
+        table_name : str
+            name of the database table
+        filters : dictionary
+            optional filters, see where()
+        """
+
+        where, params = self.where(filters)
+        if self.use_monthly_totals(filters):
+            sql = "SELECT month, type, sum, count FROM {}_monthly_totals {} \
+                ORDER BY month, type".format(table_name, where)
+        else:
+            sql = "SELECT substr(idate, 1, 7) AS month, type, SUM(price), COUNT(*) \
+                FROM {} {} GROUP BY month, type ORDER BY month, type".format(table_name, where)
+        return self.conn.execute(sql, params).fetchall()
+
+    @profiling.timed
+    def sum_by_sign(self, table_name, filters=None):
+        """sum and count of records grouped by sign of price
+
+        Expenditures are returned with sign -1, income with sign 1.
+
+        Parameters
+        ----------
+        table_name : str
+            name of the database table
+        filters : dictionary
+            optional filters, see where()
+        """
+
+        where, params = self.where(filters)
+        sql = "SELECT CASE WHEN price < 0 THEN -1 ELSE 1 END AS sign, \
+            SUM(price), COUNT(*) FROM {} {} GROUP BY sign".format(table_name, where)
+        return self.conn.execute(sql, params).fetchall()
+
+    @profiling.timed
+    def sum_by_day(self, table_name, filters=None):
+        """sum of records grouped by date, ordered by date
+
+        Parameters
+        ----------
+        table_name : str
+            name of the database table
+        filters : dictionary
+            optional filters, see where()
+        """
+
+        where, params = self.where(filters)
+        sql = "SELECT idate, SUM(price) FROM {} {} GROUP BY idate ORDER BY idate"\
+            .format(table_name, where)
+        return self.conn.execute(sql, params).fetchall()
+
+    def generation(self, table_name):
+        """number of writes to the table, counted by triggers
+
+        Parameters
+        ----------
+        table_name : str
+            name of the database table
+        """
+
+        sql = "SELECT value FROM {}_meta WHERE key = 'generation'".format(table_name)
+        return self.conn.execute(sql).fetchone()[0]
+
+    @profiling.timed
     def delete_one(self, id, table_name):
         """delete a record in the database
 
@@ -172,16 +870,16 @@ class DBConnection:
         sql_check = 'SELECT EXISTS(SELECT 1 FROM {} WHERE rowid=? LIMIT 1)'\
             .format(table_name)
         sql_delete = "DELETE FROM {} WHERE rowid=?".format(table_name)
-        self.cursor = self.conn.execute(sql_check, (id,))  
-        result = self.cursor.fetchone()
+        result = self.conn.execute(sql_check, (id,)).fetchone()
         if result[0]:
             self.cursor.execute(sql_delete, (id,))  
-            self.conn.commit()
+            self.commit()
         else:
             raise mvc_exc.ItemNotStored(
                 'Can\'t delete "{}" because it\'s not stored in table "{}"'
                 .format(id, table_name))
 
+    @profiling.timed
     def update_one(self, id, date, name, price, quantity, table_name):
         """update a record in the database
 
@@ -210,11 +908,10 @@ class DBConnection:
             .format(table_name)
         sql_update = 'UPDATE {} SET idate=?, name=?, price=?, type=? WHERE rowid=?'\
             .format(table_name)
-        self.cursor = self.conn.execute(sql_check, (id,))  # comma needed
-        result = self.cursor.fetchone()
+        result = self.conn.execute(sql_check, (id,)).fetchone()  # comma needed
         if result[0]:
             self.cursor.execute(sql_update, (date, name, price, quantity, id))
-            self.conn.commit()
+            self.commit()
         else:
             raise mvc_exc.ItemNotStored(
                 'Can\'t update "{}" because it\'s not stored in table "{}"'
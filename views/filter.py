@@ -0,0 +1,161 @@
+import tkinter as tk
+from tkinter import ttk
+
+
+class FilterBar(tk.Frame):
+    """
+    FilterBar class used to filter the transactions of table and graph
+
+    ...
+
+    Attributes
+    ----------
+    entries : dictionary
+        to store entries
+    buttons : dictionary
+        to store buttons
+    listboxes : dictionary
+        to store listboxes
+
+    Methods
+    -------
+    create_view(transaction_type)
+        to initialise the creation of the view elements
+    create_entry(frame, label, row, column, width=10)
+        to create the entry elements
+    create_listbox(frame, label, values, row, column)
+        to create the listbox elements
+    create_button(frame, name, row, column, padx=0, pady=0)
+        to create the button elements
+    get_selection(label)
+        to get the selected values of a listbox
+    clear()
+        to reset all filter elements
+    """
+
+    def __init__(self, parent, controller):
+        tk.Frame.__init__(self, parent)
+        """
+        Parameters
+        ----------
+        parent : tk.Frame
+            Parent frame for the FilterBar class
+        controller : Controller instance
+            Controller class instance to handle logic
+        """
+
+        self.entries = {}
+        self.buttons = {}
+        self.listboxes = {}
+
+    def create_view(self, transaction_type):
+        """to initialise the creation of the view elements
+
+        Parameters
+        ----------
+        transaction_type : list
+            types of transactions
+        """
+
+        self.create_entry(self, "Von", row=0, column=0)
+        self.create_entry(self, "Bis", row=0, column=1)
+        self.create_listbox(self, "Typ", values=transaction_type, row=0, column=2)
+        self.create_entry(self, "Betrag min", row=0, column=3)
+        self.create_entry(self, "Betrag max", row=0, column=4)
+        self.create_button(self, "Filtern", row=0, column=5, padx=10)
+        self.create_button(self, "Zuruecksetzen", row=0, column=6)
+
+    def create_entry(self, frame, label, row, column, width=10):
+        """to create the entry elements
+
+        Parameters
+        ----------
+        frame : tk.Frame
+            parent Object for the elements
+        label : str
+            label for the element
+        row : int
+            input for grid manager
+        column : int
+            input for grid manager
+        width : int
+            width of the entry
+        """
+
+        label_frame = tk.LabelFrame(frame, text=label)
+        self.entries[label] = tk.Entry(label_frame, width=width)
+        self.entries[label].grid(row=1, column=1)
+        label_frame.grid(row=row, column=column, sticky='nsew')
+
+    def create_listbox(self, frame, label, values, row, column):
+        """to create the listbox elements
+
+        Parameters
+        ----------
+        frame : tk.Frame
+            parent Object for the elements
+        label : str
+            label for the element
+        values : list
+            values for the element
+        row : int
+            input for grid manager
+        column : int
+            input for grid manager
+        """
+
+        label_frame = tk.LabelFrame(frame, text=label)
+        self.listboxes[label] = tk.Listbox(label_frame, selectmode=tk.MULTIPLE,
+                exportselection=False, height=3)
+        self.listboxes[label].insert('end', *values)
+        scrollbar = ttk.Scrollbar(label_frame, orient=tk.VERTICAL,
+                command=self.listboxes[label].yview)
+        self.listboxes[label].configure(yscrollcommand=scrollbar.set)
+        self.listboxes[label].grid(row=1, column=1)
+        scrollbar.grid(row=1, column=2, sticky='ns')
+        label_frame.grid(row=row, column=column, sticky='nsew')
+
+    def create_button(self, frame, name, row, column, padx=0, pady=0):
+        """to create the button elements
+
+        Parameters
+        ----------
+        frame : tk.Frame
+            parent Object for the elements
+        name : str
+            name for the element
+        row : int
+            input for grid manager
+        column : int
+            input for grid manager
+        padx : int
+            input for grid manager
+        pady : int
+            input for grid manager
+        """
+
+        self.buttons[name] = ttk.Button(frame)
+        self.buttons[name]["text"] = name
+        self.buttons[name].grid(row=row, column=column, padx=padx, pady=pady)
+
+    def get_selection(self, label):
+        """to get the selected values of a listbox
+
+        Parameters
+        ----------
+        label : str
+            label of the listbox
+        """
+
+        listbox = self.listboxes[label]
+        return [listbox.get(i) for i in listbox.curselection()]
+
+    def clear(self):
+        """to reset all filter elements
+
+        """
+
+        for entry in self.entries.values():
+            entry.delete(0, 'end')
+        for listbox in self.listboxes.values():
+            listbox.selection_clear(0, 'end')
@@ -1,5 +1,4 @@
 from tkinter.constants import DISABLED
-from tkcalendar import Calendar, DateEntry
 import tkinter as tk
 from tkinter import READABLE, ttk
 
@@ -95,6 +94,9 @@ class Form(tk.Frame):
             input for grid manager
         """
 
+        # tkcalendar loads Babel, import it when the form is created
+        from tkcalendar import DateEntry
+
         label_frame = tk.LabelFrame(frame, text=name)
         self.calendars[name] = DateEntry(label_frame,
                             width=20, background='darkblue', foreground='white', 
@@ -1,7 +1,57 @@
 import math
 import tkinter as tk
 
-CANVAS_ELEMENTS = 2
+import profiling
+
+# delay in ms to coalesce the resize events of a window drag
+RESIZE_DELAY = 50
+# colors of the series of a chart, e.g. of the categories
+COLORS = ['red', 'orange', 'green', 'blue', 'purple', '#34f423']
+
+
+def lttb(points, threshold):
+    """downsample a series with Largest-Triangle-Three-Buckets
+
+    The first and last point are kept, every bucket in between keeps the
+    point which forms the largest triangle with its neighbours. The shape
+    of the series is preserved with only `threshold` points.
+
+    Parameters
+    ----------
+    points : list
+        (x, y) tuples sorted by x
+    threshold : int
+        maximum number of points to return
+    """
+
+    n = len(points)
+    if threshold >= n or threshold < 3:
+        return list(points)
+    sampled = [points[0]]
+    bucket_size = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        # average of the next bucket
+        next_start = int((i + 1) * bucket_size) + 1
+        next_end = min(int((i + 2) * bucket_size) + 1, n)
+        next_bucket = points[next_start:next_end]
+        avg_x = sum(p[0] for p in next_bucket) / len(next_bucket)
+        avg_y = sum(p[1] for p in next_bucket) / len(next_bucket)
+        # point of the current bucket with the largest triangle
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+        ax, ay = points[a]
+        max_area = -1
+        for j in range(start, end):
+            x, y = points[j]
+            area = abs((ax - avg_x) * (y - ay) - (ax - x) * (avg_y - ay))
+            if area > max_area:
+                max_area = area
+                a_next = j
+        sampled.append(points[a_next])
+        a = a_next
+    sampled.append(points[-1])
+    return sampled
 
 
 class Graph(tk.Frame): 
@@ -10,27 +60,78 @@ class Graph(tk.Frame):
 
     ...
 
+    Charts are not drawn directly. schedule() marks a chart as dirty and
+    all dirty charts are drawn once when Tk is idle, only while the frame
+    is visible.
+
     Attributes
     ----------
-    width : int 
-        width of window 
-    height : int 
-        height of window
+    visible : bool
+        True if the frame is raised by the controller
+    data : dictionary
+        latest data of every chart
+    dirty : set
+        charts to draw on the next render
+    items : dictionary
+        canvas items of every canvas by kind and name, reused on redraw
     pie : tk.Canvas 
         Canvas for pie chart 
     bar : tk.Canvas 
         Canvas for bar chart 
+    balance : tk.Canvas 
+        Canvas for balance over time line chart 
+    spending : tk.Canvas 
+        Canvas for spending per month line chart 
+    trend : tk.Canvas 
+        Canvas for the rolling average of every category
+    yoy : tk.Canvas 
+        Canvas for the change of spending to the previous year
+    forecast : tk.Canvas 
+        Canvas for the projected balance at the end of the month
 
     Methods
     -------
     create_view():
         places the canvas objects
+
+    schedule(chart, data):
+        stores the data of a chart and requests a redraw
+
+    set_visible(visible):
+        shows or hides the charts for the render scheduler
+
+    render():
+        draws all dirty charts
         
     draw_pie(data):
         draws pie chart
 
     draw_bar(data):
         draws bar chart 
+
+    draw_balance(data):
+        draws balance over time line chart
+
+    draw_spending(data):
+        draws spending per month line chart
+
+    draw_trend(data):
+        draws rolling average per category line chart
+
+    draw_yoy(data):
+        draws change to the previous year line chart
+
+    draw_forecast(data):
+        draws balance of the month with its projection
+
+    draw_line(canvas, data, color, title):
+        draws a downsampled line chart
+
+    draw_series(canvas, series, title):
+        draws downsampled line charts with a common scale
+
+    place_item(canvas, kind, name, coords, **options):
+        creates or updates a canvas item in place
     """
 
     def __init__(self, parent, controller):
@@ -44,16 +145,40 @@ class Graph(tk.Frame):
             Controller class instance to handle logic 
         """
 
-        self.width = self.winfo_width() 
-        self.height = self.winfo_height()
-        self.bind("<Configure>", self.on_resize)
-        
+        self.visible = False
+        self.data = {}
+        self.dirty = set()
+        self.render_job = None
+        self.items = {}
+        self.used = {}
+        self.draw = {
+            "pie": self.draw_pie,
+            "bar": self.draw_bar,
+            "balance": self.draw_balance,
+            "spending": self.draw_spending,
+            "trend": self.draw_trend,
+            "yoy": self.draw_yoy,
+            "forecast": self.draw_forecast,
+        }
+
         self.columnconfigure(0, weight=1)
         self.columnconfigure(1, weight=1)
+        self.columnconfigure(2, weight=1)
+        self.columnconfigure(3, weight=1)
         self.rowconfigure(1, weight=1)
+        self.rowconfigure(2, weight=1)
 
         self.pie = tk.Canvas(self, bg="#F5F5F5")
         self.bar = tk.Canvas(self, bg='#F5F5F5')
+        self.balance = tk.Canvas(self, bg='#F5F5F5')
+        self.spending = tk.Canvas(self, bg='#F5F5F5')
+        self.trend = tk.Canvas(self, bg='#F5F5F5')
+        self.yoy = tk.Canvas(self, bg='#F5F5F5')
+        self.forecast = tk.Canvas(self, bg='#F5F5F5')
+        for chart, canvas in (("pie", self.pie), ("bar", self.bar), 
+                ("balance", self.balance), ("spending", self.spending), ("trend", self.trend),
+                ("yoy", self.yoy), ("forecast", self.forecast)):
+            canvas.bind("<Configure>", lambda e, chart=chart: self.on_resize(chart))
 
     def create_view(self):
         """places the pie chart on canvas with grid manager.
@@ -62,7 +187,78 @@ class Graph(tk.Frame):
 
         self.pie.grid(row=1, column=0, sticky="nsew")
         self.bar.grid(row=1, column=1, sticky="nsew")
+        self.trend.grid(row=1, column=2, sticky="nsew")
+        self.yoy.grid(row=1, column=3, sticky="nsew")
+        self.balance.grid(row=2, column=0, columnspan=2, sticky="nsew")
+        self.spending.grid(row=2, column=2, sticky="nsew")
+        self.forecast.grid(row=2, column=3, sticky="nsew")
+
+    def schedule(self, chart, data, delay=None):
+        """stores the data of a chart and requests a redraw
+
+        Parameters
+        ----------
+        chart : str
+            name of the chart ('pie', 'bar', 'balance', 'spending', 'trend', 'yoy'
+            or 'forecast')
+        data : list
+            data for the draw method of the chart
+        delay : int
+            delay in ms to wait for further changes, None to draw when idle
+        """
+
+        self.data[chart] = data
+        self.dirty.add(chart)
+        self.request_render(delay)
 
+    def request_render(self, delay=None):
+        """helper-method to schedule a single render
+
+        Parameters
+        ----------
+        delay : int
+            delay in ms to wait for further changes, None to draw when idle
+        """
+
+        if not self.visible:
+            return
+        if self.render_job is not None:
+            if delay is None:
+                return
+            # restart the delay, e.g. while the window is dragged
+            self.after_cancel(self.render_job)
+        if delay is None:
+            self.render_job = self.after_idle(self.render)
+        else:
+            self.render_job = self.after(delay, self.render)
+
+    def set_visible(self, visible):
+        """shows or hides the charts for the render scheduler
+
+        Parameters
+        ----------
+        visible : bool
+            True if the frame is raised
+        """
+
+        self.visible = visible
+        if visible and self.dirty:
+            self.request_render()
+
+    @profiling.timed
+    def render(self):
+        """draws all dirty charts
+
+        """
+
+        self.render_job = None
+        if not self.visible:
+            return
+        dirty, self.dirty = self.dirty, set()
+        for chart in dirty:
+            self.draw[chart](self.data[chart])
+
+    @profiling.timed
     def draw_pie(self, data):
         """to draw the pie chart on canvas.
 
@@ -72,20 +268,20 @@ class Graph(tk.Frame):
             type and amount of expenditures 
         """
 
-        self.update()
-        width = self.winfo_width() / CANVAS_ELEMENTS 
-        height = self.winfo_height()
-        self.pie.delete("all")
+        width = self.pie.winfo_width()
+        height = self.pie.winfo_height()
+        self.begin_items(self.pie)
 
         gap = 100
         self.diameter = min(width, height)-gap
         self.sw_corner = (int((width - self.diameter) / 2 ), 
                 int(height - (height - self.diameter) / 2))
         self.ne_corner = (self.sw_corner[0] + self.diameter, self.sw_corner[1] - self.diameter)
-        self.center = (int(self.width / 4), int(self.height / 2))
+        self.center = (int(width / 2), int(height / 2))
         colors = ['red', 'yellow', 'green', 'blue', 'pink', '#34f423']
         total = sum(map(lambda d: d[1], data)) 
         if total == 0:
+            self.finish_items(self.pie)
             return
         width_scale = 360.0 / total
         wedge_start = 0
@@ -94,7 +290,7 @@ class Graph(tk.Frame):
         for name, pie_val in data:
             wedge_width = pie_val * width_scale 
             wedge_width = wedge_width if wedge_width < 360 else 359.9 # edge case if only one expenditure categorie
-            self.draw_wedge(wedge_start, wedge_width, colors[color_index])
+            self.draw_wedge(name, wedge_start, wedge_width, colors[color_index])
             wedge_start += wedge_width
             color_index += 1
 
@@ -107,11 +303,17 @@ class Graph(tk.Frame):
             wedge_start += wedge_width
             color_index += 1
 
-    def draw_wedge(self, start, width, color):
+        self.finish_items(self.pie)
+        # new wedges must not cover existing labels
+        self.pie.tag_raise("label")
+
+    def draw_wedge(self, name, start, width, color):
         """helper-method to draws the wedges of the pie chart on canvas.
 
         Parameters
         ----------
+        name : str
+            category of the pie wedge
         start : float
             value for the start of the pie wedge
         width : float
@@ -120,8 +322,8 @@ class Graph(tk.Frame):
             color for the pie wedges
         """
 
-        self.pie.create_arc(self.sw_corner[0], self.sw_corner[1], self.ne_corner[0], 
-                self.ne_corner[1], start=start, extent=width, fill=color)
+        self.place_item(self.pie, "wedge", name, (self.sw_corner[0], self.sw_corner[1], 
+                self.ne_corner[0], self.ne_corner[1]), start=start, extent=width, fill=color)
 
     def draw_label(self, angle, text):
         """helper-method to draws the labels of the pie chart on canvas.
@@ -141,8 +343,9 @@ class Graph(tk.Frame):
             return self.center[0] + x_offset, self.center[1] - y_offset
 
         x,y = deg_to_coord()
-        self.pie.create_text(x, y, text=text)
+        self.place_item(self.pie, "label", text, (x, y), text=text)
 
+    @profiling.timed
     def draw_bar(self, data):
         """to draw the bar chart on canvas.
 
@@ -153,9 +356,9 @@ class Graph(tk.Frame):
         """
 
         colors = ['red', 'green']
-        self.bar.delete("all")
-        c_width = self.width / CANVAS_ELEMENTS 
-        c_height = self.height 
+        self.begin_items(self.bar)
+        c_width = self.bar.winfo_width()
+        c_height = self.bar.winfo_height()
 
         # The variables below size the bar graph
         padding_bottom = 20  
@@ -176,28 +379,220 @@ class Graph(tk.Frame):
             # Top right coordinates
             y1 = c_height - padding_bottom
             
-            self.bar.create_rectangle(x0, y0, x1, y1, fill=colors[color_index])
-            self.bar.create_text(x0 + 2, y0, anchor=tk.SW, text=str(y[0]))
+            self.place_item(self.bar, "rectangle", y[0], (x0, y0, x1, y1), fill=colors[color_index])
+            self.place_item(self.bar, "text", y[0], (x0 + 2, y0), anchor=tk.SW, text=str(y[0]))
 
             color_index += 1
 
-    def on_resize(self, event):
-        """Helper Method the scale the canvas objects on window resize
+        self.finish_items(self.bar)
+
+    @profiling.timed
+    def draw_balance(self, data):
+        """to draw the balance over time line chart on canvas.
+
+        Parameters
+        ----------
+        data : list 
+            date ordinal and balance at the end of the day
+        """
+
+        self.draw_line(self.balance, data, 'blue', 'Kontostand')
+
+    @profiling.timed
+    def draw_spending(self, data):
+        """to draw the spending per month line chart on canvas.
 
         Parameters
         ----------
-        event : tkinter.Event 
-            event triggert to handle window resize 
+        data : list 
+            month number (year * 12 + month - 1) and expenditures of the month
         """
 
-        # determine the ratio of old width/height to new width/height
-        wscale = float(event.width)/self.width
-        hscale = float(event.height)/self.height
+        self.draw_line(self.spending, data, 'red', 'Ausgaben pro Monat')
 
-        self.width = wscale*self.width
-        self.height = hscale*self.height
+    @profiling.timed
+    def draw_trend(self, data):
+        """to draw the rolling average per category line chart on canvas.
 
-        # resize the canvases 
-        self.pie.scale("all",1,0,wscale,hscale)
-        self.bar.scale("all",1,0,wscale,hscale)
+        Parameters
+        ----------
+        data : list 
+            category and its month numbers and average expenditures
+        """
+
+        self.draw_series(self.trend, [(name, points, COLORS[index % len(COLORS)]) 
+                for index, (name, points) in enumerate(data)], 'Trend pro Kategorie')
+
+    @profiling.timed
+    def draw_yoy(self, data):
+        """to draw the change of spending to the previous year on canvas.
+
+        Parameters
+        ----------
+        data : list 
+            month number and change of the expenditures to the previous year
+        """
+
+        self.draw_line(self.yoy, data, 'purple', 'Ausgaben zum Vorjahr')
+
+    @profiling.timed
+    def draw_forecast(self, data):
+        """to draw the balance of the month and its projection on canvas.
+
+        Parameters
+        ----------
+        data : list 
+            date ordinal and balance of the month, projected line to the
+            end of the month
+        """
+
+        month, projection = data
+        title = 'Prognose Monatsende'
+        if projection:
+            title = '{}: {:.2f}'.format(title, projection[-1][1])
+        self.draw_series(self.forecast, 
+                [("series", month, 'blue'), ("projection", projection, 'grey')], title)
+
+    def draw_line(self, canvas, data, color, title):
+        """to draw a line chart on canvas.
+
+        Parameters
+        ----------
+        canvas : tk.Canvas 
+            canvas to draw on
+        data : list 
+            (x, y) tuples sorted by x
+        color : str
+            color for the line
+        title : str
+            title of the chart
+        """
+
+        self.draw_series(canvas, [("series", data, color)], title)
+
+    def draw_series(self, canvas, series, title):
+        """to draw line charts with a common scale on canvas.
+
+        Every series is downsampled to about one point per horizontal pixel,
+        so the canvas holds one line per series with a bounded number of
+        points.
+
+        Parameters
+        ----------
+        canvas : tk.Canvas 
+            canvas to draw on
+        series : list 
+            name, (x, y) tuples sorted by x and color of every line
+        title : str
+            title of the chart
+        """
+
+        self.begin_items(canvas)
+        c_width = canvas.winfo_width()
+        c_height = canvas.winfo_height()
+        padding = 20
+        self.place_item(canvas, "text", "title", (padding, 2), anchor=tk.NW, text=title)
+        plot_width = c_width - 2 * padding
+        plot_height = c_height - 3 * padding
+        lines = [(name, lttb(data, int(plot_width)), color) 
+                for name, data, color in series if len(data) >= 2]
+        if not lines or plot_width < 2 or plot_height < 2:
+            self.finish_items(canvas)
+            return
+        min_x = min(points[0][0] for name, points, color in lines)
+        max_x = max(points[-1][0] for name, points, color in lines)
+        min_y = min(0, min(p[1] for name, points, color in lines for p in points))
+        max_y = max(0, max(p[1] for name, points, color in lines for p in points))
+        x_scale = plot_width / ((max_x - min_x) or 1)
+        y_scale = plot_height / ((max_y - min_y) or 1)
+
+        def to_canvas(x, y):
+            return padding + (x - min_x) * x_scale, c_height - padding - (y - min_y) * y_scale
+
+        # zero line and value range
+        zero = to_canvas(min_x, 0)
+        self.place_item(canvas, "line", "zero", 
+                (padding, zero[1], padding + plot_width, zero[1]), fill='grey')
+        self.place_item(canvas, "text", "max", (c_width - padding, 2 * padding), 
+                anchor=tk.NE, text='{:.2f}'.format(max_y))
+        self.place_item(canvas, "text", "min", (c_width - padding, c_height - padding), 
+                anchor=tk.SE, text='{:.2f}'.format(min_y))
+        for name, points, color in lines:
+            coords = []
+            for x, y in points:
+                coords.extend(to_canvas(x, y))
+            self.place_item(canvas, "line", name, coords, fill=color)
+        self.finish_items(canvas)
+
+    def begin_items(self, canvas):
+        """helper-method to start a redraw which reuses the canvas items
+
+        Parameters
+        ----------
+        canvas : tk.Canvas 
+            canvas to draw on
+        """
+
+        self.items.setdefault(canvas, {})
+        self.used[canvas] = set()
+
+    def place_item(self, canvas, kind, name, coords, **options):
+        """helper-method to create or update a canvas item in place
+
+        Items are identified by kind and name, e.g. the wedge of a category.
+        An existing item is moved with coords() and changed with
+        itemconfigure(), only new items are created.
+
+        Parameters
+        ----------
+        canvas : tk.Canvas 
+            canvas to draw on
+        kind : str
+            type of the canvas item ('arc', 'rectangle', 'line', 'text'), 
+            'wedge' and 'label' are arcs and texts of the pie chart
+        name : str
+            name of the item, unique per kind
+        coords : sequence
+            coordinates of the item
+        options :
+            options of the item
+        """
+
+        key = (kind, name)
+        items = self.items[canvas]
+        if key in items:
+            canvas.coords(items[key], *coords)
+            canvas.itemconfigure(items[key], **options)
+        else:
+            create = {"wedge": "arc", "label": "text"}.get(kind, kind)
+            items[key] = getattr(canvas, "create_" + create)(*coords, tags=(kind,), **options)
+        self.used[canvas].add(key)
+        return items[key]
+
+    def finish_items(self, canvas):
+        """helper-method to delete the items which were not placed again
+
+        Parameters
+        ----------
+        canvas : tk.Canvas 
+            canvas to draw on
+        """
+
+        items = self.items[canvas]
+        for key in set(items) - self.used[canvas]:
+            canvas.delete(items.pop(key))
+
+    def on_resize(self, chart):
+        """Helper Method to redraw a chart after its canvas was resized
+
+        Resize events are coalesced, the chart is drawn once after the
+        window stopped changing.
+
+        Parameters
+        ----------
+        chart : str
+            name of the resized chart
+        """
 
+        if chart in self.data:
+            self.schedule(chart, self.data[chart], delay=RESIZE_DELAY)
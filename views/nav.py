@@ -1,4 +1,3 @@
-from tkcalendar import Calendar, DateEntry
 import tkinter as tk
 from tkinter import ttk
 
@@ -40,6 +39,7 @@ class Nav(tk.Frame):
         self.create_button(self, "Tabelle", row=0, column=0, padx=10, pady=5)
         self.create_button(self, "Formular", row=0, column=1, padx=10, pady=5)
         self.create_button(self, "Grafik", row=0, column=2, padx=10, pady=5)
+        self.create_button(self, "Import", row=0, column=3, padx=10, pady=5)
 
     def create_button(self, frame, name, row, column, padx=0, pady=0):
         """to create the view elements
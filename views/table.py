@@ -1,21 +1,69 @@
 import tkinter as tk
 from tkinter import ttk
 
+import profiling
+from model import Transaction
+
+PAGE_SIZE = 100
+BUFFER_SIZE = 4 * PAGE_SIZE
+# position of the sortable columns in a transaction tuple
+SORT_INDEX = {"rowid": 0, "idate": 1, "name": 2, "price": 3, "type": 4}
+HEADINGS = {"rowid": "Nr.", "idate": "Datum", "name": "Bezeichnung", "price": "Betrag", "type": "Typ"}
+
 
 class Table(tk.Frame):
     """
     Table class used to display detailed view of database records 
 
+    The table works either with a complete list of transactions or as a
+    virtual table, which only creates Treeview items for the visible rows
+    and fetches pages from the model on scrolling.
+
     ...
 
+    Attributes
+    ----------
+    virtual : bool
+        True if the table shows pages of the model
+    total : int
+        number of rows in virtual mode
+    offset : int
+        position of the first visible row in virtual mode
+    visible_rows : int
+        number of rows which fit into the Treeview
+    order : str
+        column the virtual table is sorted by
+    descending : bool
+        True if the virtual table is sorted descending
+    sorted : bool
+        True once a heading was clicked, the listed rows are sorted as well
+    listed : list
+        rows of the table outside of virtual mode in the given order
+    rows : dictionary
+        values of the Treeview items by rowid
+    entries : dictionary
+        to store entries
+
     Methods
     -------
     create_view():
         to initialise the creation of the view elements
     create_table(frame, row, column, columnspan, padx, pady)
         to create the view elements
+    create_entry(frame, label, row, column, padx=0, pady=0)
+        to create the entry elements
     update(transactions)
         to update the Treeview element
+    selected()
+        to get the transaction of the focused row
+    set_source(read_window, read_page)
+        to switch to virtual mode with the given page functions
+    update_pages(total)
+        to update the Treeview element in virtual mode
+    on_scroll(*args)
+        to scroll the virtual table
+    sort(order)
+        to sort the table by a column
     """
      
     def __init__(self, parent, controller):
@@ -31,13 +79,52 @@ class Table(tk.Frame):
 
         self.columnconfigure(1, weight=1)
         self.rowconfigure(1, weight=1)
+
+        self.virtual = False
+        self.total = 0
+        self.offset = 0
+        self.visible_rows = 14
+        self.order = "rowid"
+        self.descending = False
+        self.sorted = False
+        self.listed = []
+        self.read_window = None
+        self.read_page = None
+        self.buffer = []
+        self.buffer_start = 0
+        self.rows = {}
+        self.entries = {}
     
     def create_view(self):
         """to initialise the creation of the view elements
 
         """
+        self.create_entry(self, "Suche", row=0, column=0, padx=10)
         self.create_table(self, row=1, column=0, columnspan=3, padx=10)
 
+    def create_entry(self, frame, label, row, column, padx=0, pady=0):
+        """to create the entry elements
+
+        Parameters
+        ----------
+        frame : tk.Frame
+            parent Object for the elements
+        label : str
+            label for the element
+        row : int
+            input for grid manager
+        column : int
+            input for grid manager
+        padx : int
+            input for grid manager
+        pady : int
+            input for grid manager
+        """
+        label_frame = tk.LabelFrame(frame, text=label)
+        self.entries[label] = tk.Entry(label_frame, width=30)
+        self.entries[label].grid(row=1, column=1)
+        label_frame.grid(row=row, column=column, padx=padx, pady=pady, sticky='nsw')
+
     def create_table(self, frame, row, column, columnspan=0, padx=0, pady=0):
         """to create the view elements
 
@@ -70,14 +157,23 @@ class Table(tk.Frame):
         self.trv.column("type", width=100, minwidth=100)
         # Columns Heading
         self.trv.heading("id", text="ID")
-        self.trv.heading("count", text="Nr.")
-        self.trv.heading("idate", text="Datum")
-        self.trv.heading("name", text="Bezeichnung")
-        self.trv.heading("price", text="Betrag")
-        self.trv.heading("type", text="Typ")
+        self.trv.heading("count", text="Nr.", command=lambda : self.sort("rowid"))
+        self.trv.heading("idate", text="Datum", command=lambda : self.sort("idate"))
+        self.trv.heading("name", text="Bezeichnung", command=lambda : self.sort("name"))
+        self.trv.heading("price", text="Betrag", command=lambda : self.sort("price"))
+        self.trv.heading("type", text="Typ", command=lambda : self.sort("type"))
         # place treeview widget
         self.trv.grid(row=row, column=column, columnspan=columnspan, padx=padx, pady=pady, sticky="nsew")
+        # scrollbar for both list and virtual mode
+        self.scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=self.trv.yview)
+        self.scrollbar.grid(row=row, column=column + columnspan, pady=pady, sticky="ns")
+        self.trv.configure(yscrollcommand=self.scrollbar.set)
+        self.trv.bind("<Configure>", self.on_configure)
+        self.trv.bind("<MouseWheel>", self.on_mousewheel)
+        self.trv.bind("<Button-4>", self.on_mousewheel)
+        self.trv.bind("<Button-5>", self.on_mousewheel)
   
+    @profiling.timed
     def update(self, transactions):
         """to update the Treeview element
 
@@ -86,8 +182,246 @@ class Table(tk.Frame):
         transactions : list with tuples
             list with transaction details (id, date, name, price, type) 
         """
-        self.trv.delete(*self.trv.get_children())
-        for i, value in enumerate(transactions):
-            self.trv.insert('', 'end', values=(i+1, value[0], value[1], value[2], value[3], value[4]))
+        if self.virtual:
+            self.virtual = False
+            self.scrollbar.configure(command=self.trv.yview)
+            self.trv.configure(yscrollcommand=self.scrollbar.set)
+        self.listed = list(transactions)
+        self.show_rows(self.sort_listed(), 0)
+
+    def sort_listed(self):
+        """helper-method to sort the listed rows like the virtual table
+
+        The rows keep their given order until a heading was clicked. Empty
+        values are the smallest, like NULL in the database.
+        """
+        if not self.sorted:
+            return self.listed
+        index = SORT_INDEX[self.order]
+        return sorted(self.listed, key=lambda row: (row[index] is not None, row[index], row[0]),
+                reverse=self.descending)
+
+    def show_rows(self, transactions, start):
+        """helper-method to reconcile the Treeview with the given rows
+
+        Items are keyed by the rowid of the transaction, so only new,
+        changed and removed rows touch the Treeview. Scroll position and
+        selection are kept.
+
+        Parameters
+        ----------
+        transactions : list with tuples
+            list with transaction details (id, date, name, price, type) 
+        start : int
+            position of the first row, used for the row number
+        """
+        wanted = [str(value[0]) for value in transactions]
+        keep = set(wanted)
+        removed = [iid for iid in self.trv.get_children() if iid not in keep]
+        if removed:
+            self.trv.delete(*removed)
+            for iid in removed:
+                del self.rows[iid]
+        current = list(self.trv.get_children())
+        for index, value in enumerate(transactions):
+            iid = wanted[index]
+            values = (start+index+1, value[0], value[1], value[2], value[3], value[4])
+            if iid not in self.rows:
+                self.trv.insert('', index, iid=iid, values=values)
+                current.insert(index, iid)
+            else:
+                if self.rows[iid] != values:
+                    self.trv.item(iid, values=values)
+                if index >= len(current) or current[index] != iid:
+                    self.trv.move(iid, '', index)
+                    current.remove(iid)
+                    current.insert(index, iid)
+            self.rows[iid] = values
+
+    def selected(self):
+        """to get the transaction of the focused row, None without focus
+
+        The values are taken from the shown rows, so the types of the
+        model are kept instead of the strings of the Treeview.
+        """
+        values = self.rows.get(self.trv.focus())
+        if values is None:
+            return None
+        return Transaction.from_record(values[1:])
+
+    def set_source(self, read_window, read_page):
+        """to switch to virtual mode with the given page functions
+
+        Parameters
+        ----------
+        read_window : function
+            read_window(offset, limit, order, descending) returns the rows 
+            starting at a position or None if the source is busy
+        read_page : function
+            read_page(after_rowid, limit, order, descending, after_value) returns
+            the rows following a row or None if the source is busy
+        """
+        self.read_window = read_window
+        self.read_page = read_page
+        self.virtual = True
+        self.scrollbar.configure(command=self.on_scroll)
+        self.trv.configure(yscrollcommand="")
+
+    @profiling.timed
+    def update_pages(self, total):
+        """to update the Treeview element in virtual mode
+
+        The buffered pages are dropped and the rows at the current
+        scroll position are read again.
+
+        Parameters
+        ----------
+        total : int
+            number of rows of the data source
+        """
+        self.total = total
+        self.buffer = []
+        self.buffer_start = 0
+        self.render()
+
+    @profiling.timed
+    def render(self):
+        """helper-method to show the rows at the current scroll position
+
+        """
+        if not self.virtual:
+            return
+        self.offset = max(0, min(self.offset, self.total - self.visible_rows))
+        # one extra row for the partly visible row at the bottom
+        rows = self.get_rows(self.offset, self.visible_rows + 1)
+        if rows is None:
+            # data source is busy, keep the current rows
+            return
+        self.show_rows(rows, self.offset)
+        if self.total:
+            self.scrollbar.set(self.offset / self.total,
+                    min(1.0, (self.offset + self.visible_rows) / self.total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def get_rows(self, start, count):
+        """helper-method to get rows from the page buffer or the model
+
+        Scrolling down continues with a keyset page after the last buffered
+        row, any other position seeks a new window around it. Returns None
+        if the data source is busy.
+
+        Parameters
+        ----------
+        start : int
+            position of the first row
+        count : int
+            number of rows
+        """
+        buffer_end = self.buffer_start + len(self.buffer)
+        if self.buffer_start <= start and start + count <= buffer_end:
+            pass
+        elif self.buffer and self.buffer_start <= start <= buffer_end:
+            last = self.buffer[-1]
+            page = self.read_page(last[0], max(PAGE_SIZE, count), self.order, 
+                    self.descending, last[SORT_INDEX[self.order]])
+            if page is None:
+                return None
+            drop = max(0, len(self.buffer) + len(page) - BUFFER_SIZE)
+            self.buffer = self.buffer[drop:] + page
+            self.buffer_start += drop
+        else:
+            first = max(0, start - PAGE_SIZE // 2)
+            page = self.read_window(first, PAGE_SIZE + count, self.order, self.descending)
+            if page is None:
+                return None
+            self.buffer = page
+            self.buffer_start = first
+        index = start - self.buffer_start
+        return self.buffer[index:index + count]
+
+    def on_scroll(self, *args):
+        """to scroll the virtual table, used as scrollbar command
+
+        Parameters
+        ----------
+        args : tuple
+            ('moveto', fraction) or ('scroll', number, 'units' | 'pages')
+        """
+        if args[0] == "moveto":
+            self.offset = int(float(args[1]) * self.total)
+        elif args[0] == "scroll":
+            step = self.visible_rows if args[2] == "pages" else 1
+            self.offset += int(args[1]) * step
+        self.render()
+
+    @profiling.timed
+    def sort(self, order):
+        """to sort the table by a column
+
+        A second click on the same column toggles the direction. In virtual
+        mode the rows are sorted by the database and the table starts again
+        at the top, otherwise the listed rows are sorted in memory.
+
+        Parameters
+        ----------
+        order : str
+            column to sort by, one of SORT_INDEX
+        """
+        self.sorted = True
+        if order == self.order:
+            self.descending = not self.descending
+        else:
+            self.trv.heading(self.heading_column(self.order), text=HEADINGS[self.order])
+            self.order = order
+            self.descending = False
+        arrow = " \u25bc" if self.descending else " \u25b2"
+        self.trv.heading(self.heading_column(order), text=HEADINGS[order] + arrow)
+        if not self.virtual:
+            self.show_rows(self.sort_listed(), 0)
+            return
+        self.offset = 0
+        self.update_pages(self.total)
+
+    def heading_column(self, order):
+        """helper-method to get the Treeview column of a sort column
+
+        Parameters
+        ----------
+        order : str
+            column to sort by, one of SORT_INDEX
+        """
+        return "count" if order == "rowid" else order
+
+    def on_mousewheel(self, event):
+        """Helper Method to scroll the virtual table with the mouse wheel
+
+        Parameters
+        ----------
+        event : tkinter.Event 
+            event triggert by the mouse wheel
+        """
+        if not self.virtual:
+            return
+        if event.num == 4 or event.delta > 0:
+            self.on_scroll("scroll", -3, "units")
+        else:
+            self.on_scroll("scroll", 3, "units")
+        return "break"
+
+    def on_configure(self, event):
+        """Helper Method to adapt the number of visible rows on resize
+
+        Parameters
+        ----------
+        event : tkinter.Event 
+            event triggert to handle window resize 
+        """
+        rowheight = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        # one row is taken by the headings
+        visible_rows = max(1, event.height // rowheight - 1)
+        if visible_rows != self.visible_rows:
+            self.visible_rows = visible_rows
+            self.render()
 
     